@@ -27,6 +27,7 @@ class ProgramMetadata:
     lines_of_code: int
     thought_process: str       # The thinking comments
     error_message: Optional[str] = None
+    kill_reason: Optional[str] = None  # resource limit that stopped it, if any
     screenshot_path: Optional[str] = None
     synced_to_github: bool = False
 
@@ -91,7 +92,8 @@ class Repository:
     
     def save(self, code: str, program_type: str, mood: str,
              success: bool, thought_process: str = "",
-             error_message: Optional[str] = None) -> Optional[ProgramMetadata]:
+             error_message: Optional[str] = None,
+             kill_reason: Optional[str] = None) -> Optional[ProgramMetadata]:
         """
         Save a program to the archive.
         
@@ -102,6 +104,7 @@ class Repository:
             success: Whether it ran successfully
             thought_process: Thinking comments
             error_message: Error if failed
+            kill_reason: Why the sandbox stopped it, if it did
             
         Returns:
             Created metadata or None if not saved
@@ -130,6 +133,7 @@ class Repository:
             lines_of_code=len(code.strip().split('\n')),
             thought_process=thought_process,
             error_message=error_message,
+            kill_reason=kill_reason,
             synced_to_github=False
         )
         
@@ -84,6 +84,18 @@ STATUS_BAR_HEIGHT = int(24 * _SY)
 MODE_TERMINAL = "terminal"
 MODE_RUN = "run"
 
+# Display output: "auto" (framebuffer if present, else a desktop window),
+# "framebuffer", "window", or "headless" (in-memory only — containers, CI,
+# benchmarks). Headless can save every frame as PNGs and/or keep the last
+# N frames in memory.
+DISPLAY_BACKEND = os.environ.get("DISPLAY_BACKEND", "auto").lower()
+HEADLESS_DUMP_DIR = os.environ.get("HEADLESS_DUMP_DIR", "")
+HEADLESS_RING_SIZE = int(os.environ.get("HEADLESS_RING_SIZE", "0"))
+
+# Write framebuffer frames from a background thread (latest frame wins)
+# so slow SPI writes never stall typing or program output
+DISPLAY_PRESENTER = os.environ.get("DISPLAY_PRESENTER", "true").lower() in ("1", "true", "yes")
+
 # Canvas popup window — scaled from 480x320 reference
 CANVAS_X = int(29 * _SX) + LAYOUT_OFFSET_X
 CANVAS_Y = int(35 * _SY) + LAYOUT_OFFSET_Y
@@ -165,6 +177,58 @@ WATCH_DURATION_MAX = 120
 # Delay between state transitions
 STATE_TRANSITION_DELAY = 2
 
+# Generate the next program in the background while the current one runs,
+# so WRITE starts typing immediately. Cancelled on restart/screensaver.
+SPECULATIVE_PREFETCH = os.environ.get("SPECULATIVE_PREFETCH", "true").lower() in ("1", "true", "yes")
+
+# Simulated time (simclock.py): 1.0 = real time. Below 1, every pause
+# (typing, thinking, watching, BBS reading) is scaled down while the clock
+# still advances by the full amount — 0.01 runs cycles 100x faster, 0 never
+# sleeps. For benchmarks and soak tests.
+TIME_SCALE = float(os.environ.get("TIME_SCALE", "1.0"))
+
+# =============================================================================
+# PROGRAM RUNTIME
+# =============================================================================
+
+# Send canvas draw commands as binary records on a dedicated pipe instead of
+# "CMD:" text lines on stdout. tiny_canvas falls back to text when the pipe
+# isn't offered, so turning this off is safe (handy for debugging).
+CANVAS_BINARY_PROTOCOL = True
+
+# Double-buffer the canvas popup for programs that mark frames (c.sleep(),
+# c.show() or time.sleep() all send FLIP): draws land on a back surface and
+# only become visible on FLIP, so half-drawn frames never reach the screen.
+CANVAS_DOUBLE_BUFFER = True
+
+# Share an RGB framebuffer with each program (memfd, no pipe traffic) so
+# per-pixel programs can opt in with c.pixel_buffer() + c.blit().
+CANVAS_SHARED_PIXELS = True
+
+# Start programs from a warm runner (programs/tiny_runner.py) that has the
+# canvas helpers imported already and forks one child per program, instead
+# of a fresh interpreter each time. Falls back to a cold start on failure.
+WARM_RUNNER = os.environ.get("WARM_RUNNER", "true").lower() in ("1", "true", "yes")
+
+# Resource limits for generated programs (programmer/sandbox.py), so a
+# runaway program can't starve the renderer and web server. 0 = no limit.
+PROGRAM_MEMORY_LIMIT_MB = int(os.environ.get("PROGRAM_MEMORY_LIMIT_MB", "192"))  # RLIMIT_AS + RSS watchdog
+PROGRAM_MAX_OPEN_FILES = int(os.environ.get("PROGRAM_MAX_OPEN_FILES", "64"))
+PROGRAM_NICE = int(os.environ.get("PROGRAM_NICE", "10"))  # lower CPU priority than the renderer
+# Max bytes/s read from a program's stdout and draw pipe; beyond that the
+# program blocks on a full pipe instead of flooding us
+PROGRAM_OUTPUT_RATE = int(os.environ.get("PROGRAM_OUTPUT_RATE", str(4 << 20)))
+# Optional cgroup v2 directory (delegated to this user, cpu+memory controllers
+# enabled) for hard caps: PROGRAM_CPU_QUOTA is a fraction of one core
+PROGRAM_CGROUP = os.environ.get("PROGRAM_CGROUP", "")
+PROGRAM_CPU_QUOTA = float(os.environ.get("PROGRAM_CPU_QUOTA", "0.5"))
+
+# REVIEW dry-runs each program headless for this many frames (draws are
+# only recorded, sleeps skipped) and sends crashes straight to FIX, before
+# the canvas popup opens. 0 = off. The timeout is real seconds.
+PREFLIGHT_FRAMES = int(os.environ.get("PREFLIGHT_FRAMES", "5"))
+PREFLIGHT_TIMEOUT = 3.0
+
 # =============================================================================
 # ARCHIVE
 # =============================================================================
@@ -1,5 +1,6 @@
 # Display module
 from .terminal import Terminal
 from .framebuffer import FramebufferWriter, get_writer, IS_FRAMEBUFFER_AVAILABLE
+from .headless import HeadlessWriter
 
-__all__ = ['Terminal', 'FramebufferWriter', 'get_writer', 'IS_FRAMEBUFFER_AVAILABLE']
+__all__ = ['Terminal', 'FramebufferWriter', 'get_writer', 'IS_FRAMEBUFFER_AVAILABLE', 'HeadlessWriter']
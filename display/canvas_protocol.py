@@ -0,0 +1,272 @@
+"""
+Canvas Draw Protocol
+
+Shared definitions for the draw commands a running program sends to the
+Terminal. The same commands travel in one of two encodings:
+
+- text:   "CMD:LINE,x1,y1,x2,y2,r,g,b" lines on the program's stdout.
+          Always understood; used when the binary pipe isn't offered.
+- binary: fixed-size struct records on a dedicated pipe whose write end
+          is handed to the program as TINY_CANVAS_FD. No formatting or
+          int() parsing on either side, ~12 bytes per primitive.
+
+Every command decodes to the same record tuple:
+    (opcode, a, b, c, d, r, g, b)
+where a-d are the geometry args (unused slots are 0).
+
+FLIP marks a frame boundary. Once a program sends one, the Terminal
+draws into a back surface and only shows it on the next FLIP.
+
+Batch commands (LINES, POLYLINE, POLYGON, POINTS, FILLRECTS) carry many
+primitives in one message: a header record (opcode, count, flag, 0, 0,
+r, g, b) followed by `count` item records whose opcode byte is 0. They
+decode to a single record with the item list appended:
+    (opcode, count, flag, 0, 0, r, g, b, items)
+Line/point/rect items carry their own color; polyline/polygon items pack
+two points each (x1, y1, x2, y2) and use the header color.
+
+Per-pixel programs can skip primitives entirely: the runtime shares an
+RGB framebuffer (SharedPixelBuffer, handed over as TINY_CANVAS_SHM_FD)
+that the program writes into directly; BLIT copies it onto the canvas.
+The buffer holds two frames: the program draws into one half while the
+runtime reads the other. BLIT's args are the finished half and a
+sequence number; once the Terminal has copied a half it writes that
+number into the buffer's header (PIXEL_HEADER). The program only draws
+into a half again after its last BLIT was acknowledged, and otherwise
+skips the frame, so a frame never tears even when the display falls
+behind.
+
+programs/tiny_canvas.py keeps its own copy of the record layout and
+opcodes because generated programs can't import from this package —
+keep the two in sync.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from typing import List, Optional, Tuple
+
+# opcode:u8, four int16 geometry args, r:u8, g:u8, b:u8 — 12 bytes, no padding
+RECORD = struct.Struct("<B4h3B")
+RECORD_SIZE = RECORD.size
+
+OP_CLEAR = 1
+OP_PIXEL = 2
+OP_LINE = 3
+OP_RECT = 4
+OP_FILLRECT = 5
+OP_CIRCLE = 6
+OP_FILLCIRCLE = 7
+OP_FLIP = 8  # present: the frame drawn so far becomes visible
+OP_BLIT = 9  # copy half a (0/1) of the shared pixel buffer onto the canvas, b = seq
+OP_LINES = 10  # batch: independent segments, item (x1, y1, x2, y2, color)
+OP_POLYLINE = 11  # batch: connected points, flag = closed
+OP_POLYGON = 12  # batch: polygon points, flag = filled
+OP_POINTS = 13  # batch: pixels, item (x, y, 0, 0, color)
+OP_FILLRECTS = 14  # batch: filled rects, item (x, y, w, h, color)
+
+BATCH_OPS = (OP_LINES, OP_POLYLINE, OP_POLYGON, OP_POINTS, OP_FILLRECTS)
+POINT_BATCH_OPS = (OP_POLYLINE, OP_POLYGON)
+MAX_BATCH = 32767  # item count travels in an int16
+
+# Shared pixel buffer header: sequence number (BLIT's b) of the last
+# BLIT the Terminal copied; the frames follow it
+PIXEL_HEADER = struct.Struct("<I")
+BLIT_SEQ_MASK = 0x7fff  # sequence numbers wrap to fit an int16
+
+# Commands that repaint every canvas pixel — whatever came before is gone
+FULL_FRAME_OPS = (OP_CLEAR, OP_BLIT)
+
+# Text command name -> (opcode, number of geometry args before r,g,b)
+TEXT_COMMANDS = {
+    "CLEAR": (OP_CLEAR, 0),
+    "PIXEL": (OP_PIXEL, 2),
+    "LINE": (OP_LINE, 4),
+    "RECT": (OP_RECT, 4),
+    "FILLRECT": (OP_FILLRECT, 4),
+    "CIRCLE": (OP_CIRCLE, 3),
+    "FILLCIRCLE": (OP_FILLCIRCLE, 3),
+    "FLIP": (OP_FLIP, 0),
+    "BLIT": (OP_BLIT, 0),
+}
+
+# Batch text commands: "CMD:LINES,x1,y1,x2,y2,r,g,b,x1,..." repeats
+# (item geometry args + r,g,b); name -> (opcode, item geometry args)
+BATCH_TEXT_COMMANDS = {
+    "LINES": (OP_LINES, 4),
+    "POINTS": (OP_POINTS, 2),
+    "FILLRECTS": (OP_FILLRECTS, 4),
+}
+# "CMD:POLYLINE,flag,r,g,b,x,y,x,y,..." — name -> opcode
+POINT_TEXT_COMMANDS = {
+    "POLYLINE": OP_POLYLINE,
+    "POLYGON": OP_POLYGON,
+}
+
+Record = Tuple[int, int, int, int, int, int, int, int]
+
+
+def parse_text_command(cmd_str: str) -> Optional[Record]:
+    """Parse a "CMD:NAME,args..." line into a record tuple.
+
+    Returns None for unknown or malformed commands.
+    """
+    try:
+        parts = cmd_str.strip().split(':', 1)[1].split(',')
+        spec = TEXT_COMMANDS.get(parts[0])
+        if spec is None:
+            return _parse_text_batch(parts)
+        op, n_geom = spec
+        if op == OP_FLIP:
+            return (op, 0, 0, 0, 0, 0, 0, 0)
+        if op == OP_BLIT:
+            half = int(parts[1]) & 1 if len(parts) > 1 else 0
+            seq = int(parts[2]) & BLIT_SEQ_MASK if len(parts) > 2 else 0
+            return (op, half, seq, 0, 0, 0, 0, 0)
+        args = [int(x) for x in parts[1:]]
+        if len(args) < n_geom + 3:
+            return None
+        geom = args[:n_geom] + [0] * (4 - n_geom)
+        return (op, geom[0], geom[1], geom[2], geom[3],
+                args[n_geom], args[n_geom + 1], args[n_geom + 2])
+    except (IndexError, ValueError):
+        return None
+
+
+def _parse_text_batch(parts: List[str]) -> Optional[tuple]:
+    """Parse the name/args of a batch text command into a batch record."""
+    if parts[0] in POINT_TEXT_COMMANDS:
+        args = [int(x) for x in parts[1:]]
+        if len(args) < 4:
+            return None
+        flag, r, g, b = args[:4]
+        coords = args[4:4 + (len(args) - 4) // 2 * 2]
+        count = min(len(coords) // 2, MAX_BATCH)
+        coords = coords[:count * 2] + [0, 0]  # pad a trailing odd point
+        items = [(0, coords[i], coords[i + 1], coords[i + 2], coords[i + 3], 0, 0, 0)
+                 for i in range(0, count * 2, 4)]
+        return (POINT_TEXT_COMMANDS[parts[0]], count, flag, 0, 0, r, g, b, items)
+
+    spec = BATCH_TEXT_COMMANDS.get(parts[0])
+    if spec is None:
+        return None
+    op, n_geom = spec
+    args = [int(x) for x in parts[1:]]
+    step = n_geom + 3
+    items = []
+    for i in range(0, len(args) - step + 1, step):
+        geom = args[i:i + n_geom] + [0] * (4 - n_geom)
+        items.append((0, geom[0], geom[1], geom[2], geom[3],
+                      args[i + n_geom], args[i + n_geom + 1], args[i + n_geom + 2]))
+    items = items[:MAX_BATCH]
+    return (op, len(items), 0, 0, 0, 0, 0, 0, items)
+
+
+def batch_points(record: tuple) -> List[Tuple[int, int]]:
+    """Unpack the (x, y) points of a POLYLINE/POLYGON batch record."""
+    points = []
+    for item in record[8]:
+        points.append((item[1], item[2]))
+        points.append((item[3], item[4]))
+    del points[record[1]:]
+    return points
+
+
+class RecordDecoder:
+    """
+    Reassembles binary records from arbitrary-sized pipe reads.
+
+    A read can end mid-record or mid-batch; the tail is kept until the
+    next feed(). Batch headers are returned with their items attached.
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, data: bytes) -> List[Record]:
+        """Decode all complete records in pending + data."""
+        if self._pending:
+            data = self._pending + data
+        usable = len(data) - (len(data) % RECORD_SIZE)
+        if not usable:
+            self._pending = data
+            return []
+        records = list(RECORD.iter_unpack(memoryview(data)[:usable]))
+        opcodes = data[0:usable:RECORD_SIZE]
+        if not any(op in opcodes for op in BATCH_OPS):
+            self._pending = data[usable:]
+            return records
+
+        # Attach each batch's items to its header record
+        out = []
+        i = 0
+        n = len(records)
+        while i < n:
+            rec = records[i]
+            if rec[0] in BATCH_OPS:
+                count = max(0, rec[1])
+                n_items = (count + 1) // 2 if rec[0] in POINT_BATCH_OPS else count
+                end = i + 1 + n_items
+                if end > n:
+                    break  # rest of the batch hasn't arrived yet
+                out.append(rec + (records[i + 1:end],))
+                i = end
+            else:
+                out.append(rec)
+                i += 1
+        self._pending = data[i * RECORD_SIZE:]
+        return out
+
+    @property
+    def pending_bytes(self) -> int:
+        """Bytes of an incomplete record waiting for the rest."""
+        return len(self._pending)
+
+
+class SharedPixelBuffer:
+    """
+    RGB framebuffer shared between the runtime and a running program.
+
+    Backed by an anonymous memfd (or an already-unlinked temp file), so
+    nothing is left behind if either side crashes. The fd is passed to
+    the child like the draw pipe; both sides mmap it. It holds a
+    PIXEL_HEADER, then FRAMES frames back to back, each row-major with 3
+    bytes per pixel — what pygame.image.frombuffer(..., "RGB") expects.
+    The program always draws into the half it didn't name in its last
+    BLIT, and reuses a half only once its BLIT was acknowledged.
+    """
+
+    FRAMES = 2
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.frame_size = width * height * 3
+        self.size = PIXEL_HEADER.size + self.frame_size * self.FRAMES
+        if hasattr(os, "memfd_create"):
+            self.fd = os.memfd_create("tiny_canvas", 0)
+        else:
+            with tempfile.TemporaryFile() as f:
+                self.fd = os.dup(f.fileno())
+        os.ftruncate(self.fd, self.size)
+        self.buffer = mmap.mmap(self.fd, self.size)
+
+    def frame(self, index: int) -> memoryview:
+        """Writable view of one frame of the buffer."""
+        start = PIXEL_HEADER.size + index * self.frame_size
+        return memoryview(self.buffer)[start:start + self.frame_size]
+
+    def header(self) -> memoryview:
+        """Writable view of the header, for acknowledging BLITs."""
+        return memoryview(self.buffer)[:PIXEL_HEADER.size]
+
+    def close(self):
+        """Unmap and close. Surfaces built on the buffer must be gone."""
+        try:
+            self.buffer.close()
+        except BufferError:
+            pass  # still exported; freed with the last reference
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
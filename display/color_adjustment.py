@@ -3,6 +3,11 @@ Color Adjustment Layer for TinyProgrammer Display
 
 Applies Photoshop-style color adjustments to the entire rendered frame
 before writing to framebuffer. Works on numpy arrays for efficiency.
+
+The framebuffer path doesn't run the blend math per frame: each scheme is
+compiled once into lookup tables (get_rgb565_luts) that fuse the
+adjustment with RGB565 packing. apply_color_adjustment() is still the
+reference implementation the tables are built from.
 """
 
 import numpy as np
@@ -184,6 +189,61 @@ def apply_desaturate(r, g, b, color, intensity):
     return r_out, g_out, b_out
 
 
+# scheme name -> (lut_r, lut_g, lut_b, remap), built on first use
+_LUT_CACHE = {}
+
+
+def get_rgb565_luts(scheme_name):
+    """
+    Lookup tables that adjust and pack 8-bit channels straight to RGB565.
+
+    Returns (lut_r, lut_g, lut_b, remap). Each lut_* is a 256-entry uint16
+    table already shifted into its RGB565 field, so
+        rgb565 = lut_r[r] | lut_g[g] | lut_b[b]
+    Per-channel schemes (multiply, screen, overlay, invert) are folded
+    into those tables. Desaturate mixes channels, so it comes back as
+    plain packing tables plus remap: a 65536-entry RGB565 -> RGB565 table
+    to apply with np.take. remap is None for every other scheme.
+    """
+    luts = _LUT_CACHE.get(scheme_name)
+    if luts is None:
+        luts = _build_rgb565_luts(scheme_name)
+        _LUT_CACHE[scheme_name] = luts
+    return luts
+
+
+def _pack_luts(r, g, b):
+    """Shift 256-entry channel tables into their RGB565 fields."""
+    return ((r.astype(np.uint16) >> 3) << 11,
+            (g.astype(np.uint16) >> 2) << 5,
+            b.astype(np.uint16) >> 3)
+
+
+def _build_rgb565_luts(scheme_name):
+    levels = np.arange(256, dtype=np.uint16)
+    scheme = COLOR_SCHEMES.get(scheme_name)
+
+    if scheme is not None and scheme["mode"] == "desaturate":
+        # Expand every RGB565 code back to 8 bits, run the reference
+        # adjustment once over all 65536 of them, and repack
+        codes = np.arange(65536, dtype=np.uint32)
+        r5 = (codes >> 11) & 0x1F
+        g6 = (codes >> 5) & 0x3F
+        b5 = codes & 0x1F
+        r = ((r5 << 3) | (r5 >> 2)).astype(np.uint16)
+        g = ((g6 << 2) | (g6 >> 4)).astype(np.uint16)
+        b = ((b5 << 3) | (b5 >> 2)).astype(np.uint16)
+        r, g, b = apply_color_adjustment(r, g, b, scheme_name)
+        pr, pg, pb = _pack_luts(r, g, b)
+        lut_r, lut_g, lut_b = _pack_luts(levels, levels, levels)
+        return lut_r, lut_g, lut_b, (pr | pg | pb).astype(np.uint16)
+
+    # Per-channel schemes: output channel depends only on the same input channel
+    r, g, b = apply_color_adjustment(levels, levels.copy(), levels.copy(), scheme_name)
+    lut_r, lut_g, lut_b = _pack_luts(r, g, b)
+    return lut_r, lut_g, lut_b, None
+
+
 def get_available_schemes():
     """Return list of available color scheme names."""
     return list(COLOR_SCHEMES.keys())
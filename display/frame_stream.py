@@ -4,54 +4,254 @@ Shared frame buffer for MJPEG web streaming.
 Terminal pushes frames here after each render; the Flask /stream endpoint
 reads them to serve a live browser preview.
 
-Encoding is rate-limited to ~10fps so the overhead on slow hardware
-(Pi Zero, Pi 4) is negligible regardless of the display refresh rate.
+Nothing happens unless someone is watching: /stream registers each
+client, and put_frame() returns immediately while there are none. With
+clients connected, put_frame() only takes a cheap surface copy (at the
+fastest rate any client asked for); JPEG encoding runs on a background
+worker, once per quality level in use, so it never blocks rendering.
+
+Every encoded frame gets a sequence number. Viewers block in wait_frame()
+until a newer frame exists, so an unchanged screen sends nothing and a
+slow viewer jumps straight to the newest frame instead of queueing.
+
+Tile viewers (/stream/tiles) get deltas instead of whole frames: the
+screen is split into TILE x TILE blocks, each compared with the previous
+snapshot, and only changed blocks are PNG-encoded. Every tile records the
+version it last changed in, so wait_tiles(after_version) returns exactly
+the tiles a viewer is missing, however far behind it is.
 """
 
 import io
 import time
 import threading
 
-_lock = threading.Lock()
-_latest_frame: bytes = b""
-_last_encode_time: float = 0.0
-_ENCODE_INTERVAL = 0.1  # seconds — caps encoding at ~10fps
+import numpy as np
+
+DEFAULT_QUALITY = 70
+DEFAULT_FPS = 10
+MAX_FPS = 30
+TILE = 32
+
+_lock = threading.Condition()  # notified whenever a new frame is encoded
+_clients = {}  # client id -> (JPEG quality or None for tile viewers, fps)
+_next_client_id = 1
+_frames = {}  # JPEG quality -> (sequence number, latest encoded frame)
+_frame_seq = 0
+_pending = None  # latest surface copy waiting for the encoder
+_last_snapshot_time: float = 0.0
+_wake = threading.Event()
+_worker = None
+
+# Tile deltas
+_tile_version = 0
+_tile_size = (0, 0)  # (width, height) of the tiled frame
+_tile_prev = None  # (height, width, 3) array the tiles were last diffed against
+_tile_versions = None  # (rows, cols) version each tile last changed in
+_tile_png = {}  # (x, y) -> (w, h, PNG bytes) for every tile
+
+
+def register_client(quality: int = DEFAULT_QUALITY, fps: float = DEFAULT_FPS) -> int:
+    """Start streaming for a new viewer. Returns its client id.
+
+    quality=None registers a tile-delta viewer (see wait_tiles()).
+    """
+    global _next_client_id, _last_snapshot_time
+    if quality is not None:
+        quality = max(10, min(95, int(quality)))
+    fps = max(1.0, min(float(MAX_FPS), float(fps)))
+    with _lock:
+        client_id = _next_client_id
+        _next_client_id += 1
+        _clients[client_id] = (quality, fps)
+        # Snapshot on the next put_frame() so the viewer gets a picture
+        _last_snapshot_time = 0.0
+    return client_id
+
+
+def unregister_client(client_id: int) -> None:
+    """Stop streaming for a viewer that disconnected."""
+    with _lock:
+        _clients.pop(client_id, None)
+        in_use = {q for q, _ in _clients.values() if q is not None}
+        for quality in list(_frames):
+            if quality not in in_use:
+                del _frames[quality]
+
+
+def client_count() -> int:
+    """Number of connected stream viewers."""
+    return len(_clients)
 
 
 def put_frame(surface) -> None:
-    """Convert a pygame surface to JPEG and store it for streaming.
+    """Queue a copy of a pygame surface for JPEG encoding.
 
-    Rate-limited: skips encoding if called more frequently than
-    _ENCODE_INTERVAL, so fast render loops on the Pi pay almost no cost.
+    Free when nobody is watching. Otherwise rate-limited to the fastest
+    client's fps; the copy is the only work done on the caller's thread.
     """
-    global _latest_frame, _last_encode_time
+    global _pending, _last_snapshot_time
+
+    if not _clients:
+        return
 
     now = time.monotonic()
-    if now - _last_encode_time < _ENCODE_INTERVAL:
-        return  # not time yet — skip encoding entirely
+    with _lock:
+        if not _clients:
+            return
+        interval = 1.0 / max(fps for _, fps in _clients.values())
+        if now - _last_snapshot_time < interval:
+            return  # not time yet — skip entirely
+        _last_snapshot_time = now
 
     try:
-        import numpy as np
-        from PIL import Image
-        import pygame
+        snapshot = surface.copy()
+    except Exception:
+        return
+    with _lock:
+        _pending = snapshot  # an unencoded older snapshot is simply replaced
+    _ensure_worker()
+    _wake.set()
 
-        # surfarray gives (w, h, 3); PIL wants (h, w, 3)
-        arr = pygame.surfarray.array3d(surface)
-        arr = arr.transpose(1, 0, 2)
-        img = Image.fromarray(arr.astype("uint8"), "RGB")
 
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=70)
-        frame = buf.getvalue()
+def _ensure_worker():
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        _worker = threading.Thread(target=_encode_loop, name="frame-encoder", daemon=True)
+        _worker.start()
+
 
+def _encode_loop():
+    global _pending, _frame_seq
+    from PIL import Image
+    import pygame
+
+    to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+    last_rgb = None
+
+    while True:
+        _wake.wait()
+        _wake.clear()
         with _lock:
-            _latest_frame = frame
-        _last_encode_time = now
-    except Exception:
-        pass
+            snapshot = _pending
+            _pending = None
+            qualities = sorted({q for q, _ in _clients.values() if q is not None})
+            want_tiles = any(q is None for q, _ in _clients.values())
+        if snapshot is None:
+            continue
 
+        try:
+            rgb = to_bytes(snapshot, "RGB")
+            img = Image.frombytes("RGB", snapshot.get_size(), rgb)
+            if want_tiles:
+                _update_tiles(img, rgb)
 
-def get_frame() -> bytes:
+            # Unchanged screen: keep the current frame (and its sequence
+            # number) unless a quality level has no frame yet
+            with _lock:
+                missing = [q for q in qualities if q not in _frames]
+            if rgb == last_rgb and not missing:
+                continue
+            if rgb != last_rgb:
+                missing = qualities
+            last_rgb = rgb
+            if not missing:
+                continue
+
+            encoded = {}
+            for quality in missing:
+                buf = io.BytesIO()
+                img.save(buf, format="JPEG", quality=quality)
+                encoded[quality] = buf.getvalue()
+            with _lock:
+                _frame_seq += 1
+                for quality, frame in encoded.items():
+                    _frames[quality] = (_frame_seq, frame)
+                _lock.notify_all()
+        except Exception:
+            pass
+
+
+def _update_tiles(img, rgb: bytes):
+    """Diff a snapshot against the last tiled one; PNG-encode changed tiles."""
+    global _tile_version, _tile_size, _tile_prev, _tile_versions
+    width, height = img.size
+    frame = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width, 3)
+    rows = -(-height // TILE)
+    cols = -(-width // TILE)
+
+    if _tile_prev is None or _tile_prev.shape != frame.shape:
+        changed = np.ones((rows, cols), dtype=bool)
+    else:
+        diff = (frame != _tile_prev).any(axis=2)
+        padded = np.zeros((rows * TILE, cols * TILE), dtype=bool)
+        padded[:height, :width] = diff
+        changed = padded.reshape(rows, TILE, cols, TILE).any(axis=(1, 3))
+    if not changed.any():
+        return
+
+    encoded = {}
+    for row, col in zip(*np.nonzero(changed)):
+        x, y = int(col) * TILE, int(row) * TILE
+        box = (x, y, min(x + TILE, width), min(y + TILE, height))
+        buf = io.BytesIO()
+        img.crop(box).save(buf, format="PNG")
+        encoded[(x, y)] = (box[2] - x, box[3] - y, buf.getvalue())
+
+    with _lock:
+        if _tile_versions is None or _tile_versions.shape != changed.shape:
+            _tile_versions = np.zeros(changed.shape, dtype=np.int64)
+            _tile_png.clear()
+        _tile_version += 1
+        _tile_versions[changed] = _tile_version
+        _tile_png.update(encoded)
+        _tile_size = (width, height)
+        _lock.notify_all()
+    _tile_prev = frame
+
+
+def wait_tiles(after_version: int = 0, timeout: float = 10.0):
+    """Block until some tile changed after after_version.
+
+    Returns (version, (width, height), tiles) where tiles is a list of
+    (x, y, w, h, png_bytes) for every tile newer than after_version —
+    all of them for a new viewer (after_version=0). On timeout the list
+    is empty and version is unchanged.
+    """
+    def newer():
+        return _tile_versions is not None and _tile_version > after_version
+
+    with _lock:
+        if not _lock.wait_for(newer, timeout):
+            return after_version, _tile_size, []
+        tiles = []
+        for row, col in zip(*np.nonzero(_tile_versions > after_version)):
+            x, y = int(col) * TILE, int(row) * TILE
+            w, h, png = _tile_png[(x, y)]
+            tiles.append((x, y, w, h, png))
+        return _tile_version, _tile_size, tiles
+
+
+def _lookup(quality: int):
+    """(seq, frame) for quality, falling back to any encoded quality."""
+    entry = _frames.get(quality)
+    if entry is None and _frames:
+        entry = next(iter(_frames.values()))
+    return entry or (0, b"")
+
+
+def get_frame(quality: int = DEFAULT_QUALITY) -> bytes:
     """Return the latest JPEG frame bytes (empty bytes if none yet)."""
     with _lock:
-        return _latest_frame
+        return _lookup(quality)[1]
+
+
+def wait_frame(quality: int = DEFAULT_QUALITY, after_seq: int = 0,
+               timeout: float = 10.0):
+    """Block until a frame newer than after_seq exists.
+
+    Returns (seq, frame). On timeout returns the current frame, which may
+    be the one the caller already has (empty bytes if there is none).
+    """
+    with _lock:
+        _lock.wait_for(lambda: _lookup(quality)[0] > after_seq, timeout)
+        return _lookup(quality)
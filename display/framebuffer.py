@@ -9,10 +9,13 @@ Works with fbtft-based displays (ILI9486, ILI9341, etc.)
 Also works with HDMI displays that report portrait framebuffer (480x800)
 """
 
+import mmap
 import os
+from typing import Tuple
+
 import numpy as np
 
-from .color_adjustment import apply_color_adjustment
+from .color_adjustment import get_rgb565_luts
 
 # Module-level color scheme setting (can be changed at runtime)
 _color_scheme = "none"
@@ -39,34 +42,67 @@ IS_FRAMEBUFFER_AVAILABLE = os.path.exists(FB_DEVICE)
 FB_ROTATION = int(os.environ.get("FB_ROTATION", "-1"))  # -1 = auto-detect
 
 
+# Reused conversion buffers, keyed by (height, width): (out, scratch, index)
+_buffers = {}
+_MAX_BUFFERS = 16  # full frame plus the common damaged-rect sizes
+
+
+def _get_buffers(height: int, width: int):
+    bufs = _buffers.get((height, width))
+    if bufs is None:
+        if len(_buffers) >= _MAX_BUFFERS:
+            _buffers.clear()
+        bufs = (np.empty((height, width), dtype=np.uint16),
+                np.empty((height, width), dtype=np.uint16),
+                # np.take converts indices to intp; keep them here so it doesn't allocate
+                np.empty((height, width), dtype=np.intp))
+        _buffers[(height, width)] = bufs
+    return bufs
+
+
 def rgb888_to_rgb565(surface) -> np.ndarray:
     """
     Convert a pygame surface (RGB888) to RGB565 numpy array.
     Applies color adjustment layer if set.
 
     RGB565 format: RRRRR GGGGGG BBBBB (16 bits)
+
+    Reads the surface's pixels in place (surfarray.pixels3d — a view that
+    follows the surface's channel shifts, no copy) into preallocated
+    (height, width) buffers, so steady-state conversion allocates nothing.
+    The returned array is reused by the next call of the same size: copy
+    it out before converting again.
     """
     import pygame
-    # Get pixel array (RGB888)
-    arr = pygame.surfarray.array3d(surface)  # Shape: (width, height, 3)
-
-    # Extract RGB channels
-    r = arr[:, :, 0].astype(np.uint16)
-    g = arr[:, :, 1].astype(np.uint16)
-    b = arr[:, :, 2].astype(np.uint16)
-
-    # Apply color adjustment layer if active
-    if _color_scheme != "none":
-        r, g, b = apply_color_adjustment(r, g, b, _color_scheme)
-
-    # Convert to RGB565
-    # R: 8 bits -> 5 bits (shift right 3, then left 11)
-    # G: 8 bits -> 6 bits (shift right 2, then left 5)
-    # B: 8 bits -> 5 bits (shift right 3)
-    rgb565 = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
-
-    # Transpose because pygame uses (x, y) but framebuffer uses (y, x)
-    return rgb565.T.astype(np.uint16)
+    width, height = surface.get_size()
+    out, scratch, index = _get_buffers(height, width)
+    # pygame indexes (x, y); the buffers are (y, x) like the framebuffer
+    index_t = index.T
+
+    try:
+        arr = pygame.surfarray.pixels3d(surface)  # (width, height, 3) view
+    except ValueError:
+        arr = pygame.surfarray.array3d(surface)  # not 24/32-bit: copy
+
+    # Adjust + pack in one pass: lookup tables already hold each channel's
+    # adjusted value shifted into its RGB565 field
+    lut_r, lut_g, lut_b, remap = get_rgb565_luts(_color_scheme)
+    np.copyto(index_t, arr[:, :, 0])
+    lut_r.take(index, out=out, mode='clip')
+    np.copyto(index_t, arr[:, :, 1])
+    lut_g.take(index, out=scratch, mode='clip')
+    out |= scratch
+    np.copyto(index_t, arr[:, :, 2])
+    lut_b.take(index, out=scratch, mode='clip')
+    out |= scratch
+    del arr  # release the surface lock
+
+    # Schemes that mix channels (desaturate) remap the packed pixels
+    if remap is not None:
+        np.copyto(index, out)
+        remap.take(index, out=scratch, mode='clip')
+        return scratch
+    return out
 
 
 class FramebufferWriter:
@@ -107,6 +143,82 @@ class FramebufferWriter:
                 print(f"[FB] Could not verify dimensions: {e}")
                 self.rotation = 0 if self.rotation == -1 else self.rotation
 
+        # Persistent mapping of the framebuffer (see _open_mapping)
+        self.line_length = self.fb_width * 2
+        self._fd = None
+        self._map = None
+        self._view = None
+        if self.enabled:
+            self._open_mapping()
+
+    def _read_stride(self) -> int:
+        """Bytes per framebuffer line, from sysfs (rows may be padded)."""
+        stride_path = f"/sys/class/graphics/{os.path.basename(self.device)}/stride"
+        try:
+            with open(stride_path) as f:
+                stride = int(f.read().strip())
+            if stride >= self.fb_width * 2:
+                return stride
+        except (OSError, ValueError):
+            pass
+        return self.fb_width * 2
+
+    def _open_mapping(self):
+        """
+        Open and mmap the framebuffer once.
+
+        Frames are copied straight into a numpy view of the mapping — no
+        open/write/close and no frame-sized bytes copy per flip. If the
+        device can't be mapped, writes fall back to plain file I/O.
+        """
+        self.line_length = self._read_stride()
+        try:
+            self._fd = os.open(self.device, os.O_RDWR)
+            self._map = mmap.mmap(self._fd, self.line_length * self.fb_height,
+                                  mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            rows = np.ndarray((self.fb_height, self.line_length // 2),
+                              dtype=np.uint16, buffer=self._map)
+            self._view = rows[:, :self.fb_width]
+            print(f"[FB] Mapped {self.device}: {self.fb_width}x{self.fb_height}, "
+                  f"stride {self.line_length}")
+        except Exception as e:
+            print(f"[FB] mmap failed ({e}), using file writes")
+            self.close()
+
+    def close(self):
+        """Release the framebuffer mapping."""
+        self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except (BufferError, ValueError):
+                pass
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _put(self, block: np.ndarray, fx: int, fy: int) -> bool:
+        """Copy a framebuffer-oriented RGB565 block to (fx, fy)."""
+        h = min(block.shape[0], self.fb_height - fy)
+        w = min(block.shape[1], self.fb_width - fx)
+        if h <= 0 or w <= 0:
+            return True
+        if self._view is not None:
+            np.copyto(self._view[fy:fy + h, fx:fx + w], block[:h, :w])
+            return True
+
+        # File fallback: one write per row, or one for full-width blocks
+        with open(self.device, 'r+b') as fb:
+            if fx == 0 and w == self.fb_width and self.line_length == w * 2:
+                fb.seek(fy * self.line_length)
+                fb.write(np.ascontiguousarray(block[:h, :w]).tobytes())
+                return True
+            for row in range(h):
+                fb.seek((fy + row) * self.line_length + fx * 2)
+                fb.write(np.ascontiguousarray(block[row, :w]).tobytes())
+        return True
+
     def write(self, surface) -> bool:
         """
         Write a pygame surface to the framebuffer.
@@ -117,24 +229,67 @@ class FramebufferWriter:
             return False
 
         try:
-            # Convert to RGB565
-            rgb565 = rgb888_to_rgb565(surface)
+            # Convert to RGB565, rotate into framebuffer orientation
+            rgb565 = self._rotate(rgb888_to_rgb565(surface))
+            return self._put(rgb565, 0, 0)
+        except Exception as e:
+            print(f"[FB] Write error: {e}")
+            return False
 
-            # Apply rotation if needed
-            if self.rotation == 1:  # 90° CW
-                rgb565 = np.rot90(rgb565, k=-1)  # k=-1 is 90° CW
-            elif self.rotation == 2:  # 180°
-                rgb565 = np.rot90(rgb565, k=2)
-            elif self.rotation == 3:  # 270° CW (90° CCW)
-                rgb565 = np.rot90(rgb565, k=1)  # k=1 is 90° CCW
+    # Damaged area above which one full-frame write beats many row writes
+    FULL_WRITE_FRACTION = 0.5
+
+    def _rotate(self, rgb565: np.ndarray) -> np.ndarray:
+        """Rotate a (rows, cols) RGB565 array into framebuffer orientation."""
+        if self.rotation == 1:  # 90° CW
+            return np.rot90(rgb565, k=-1)
+        elif self.rotation == 2:  # 180°
+            return np.rot90(rgb565, k=2)
+        elif self.rotation == 3:  # 270° CW (90° CCW)
+            return np.rot90(rgb565, k=1)
+        return rgb565
+
+    def _fb_rect(self, x: int, y: int, w: int, h: int) -> Tuple[int, int, int, int]:
+        """Map a render-space rect to framebuffer space (x, y, w, h)."""
+        W, H = self.render_width, self.render_height
+        if self.rotation == 1:
+            return H - y - h, x, h, w
+        elif self.rotation == 2:
+            return W - x - w, H - y - h, w, h
+        elif self.rotation == 3:
+            return y, W - x - w, h, w
+        return x, y, w, h
+
+    def write_rects(self, surface, rects) -> bool:
+        """
+        Write only the given regions of a pygame surface to the framebuffer.
 
-            # Ensure contiguous array for writing
-            rgb565 = np.ascontiguousarray(rgb565)
+        rects are (x, y, w, h) rects in render space. Each is converted on
+        its own and copied to its framebuffer offset, so a cursor blink
+        costs a few KB instead of a whole frame. Falls back to write()
+        when most of the screen is damaged.
+        """
+        if not self.enabled:
+            return False
 
-            # Write to framebuffer
-            with open(self.device, 'r+b') as fb:
-                fb.write(rgb565.tobytes())
+        sw, sh = surface.get_size()
+        clipped = []
+        for rect in rects:
+            x, y, w, h = rect
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(sw, x + w), min(sh, y + h)
+            if x1 > x0 and y1 > y0:
+                clipped.append((x0, y0, x1 - x0, y1 - y0))
+        if not clipped:
+            return True
+        if sum(w * h for _, _, w, h in clipped) >= sw * sh * self.FULL_WRITE_FRACTION:
+            return self.write(surface)
 
+        try:
+            for x, y, w, h in clipped:
+                block = self._rotate(rgb888_to_rgb565(surface.subsurface((x, y, w, h))))
+                fx, fy, _, _ = self._fb_rect(x, y, w, h)
+                self._put(block, fx, fy)
             return True
         except Exception as e:
             print(f"[FB] Write error: {e}")
@@ -150,12 +305,11 @@ class FramebufferWriter:
         try:
             # Convert RGB888 to RGB565
             color = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
-            data = np.full((self.height, self.width), color, dtype=np.uint16)
-
-            with open(self.device, 'r+b') as fb:
-                fb.write(data.tobytes())
-
-            return True
+            if self._view is not None:
+                self._view.fill(color)
+                return True
+            data = np.full((self.fb_height, self.fb_width), color, dtype=np.uint16)
+            return self._put(data, 0, 0)
         except Exception as e:
             print(f"[FB] Clear error: {e}")
             return False
@@ -0,0 +1,65 @@
+"""
+Headless Display Backend
+
+Stands in for the framebuffer writer when there is no screen at all:
+containers, CI, and rendering benchmarks. The Terminal still renders into
+its in-memory surface (which the web stream reads); frames go nowhere
+unless asked to:
+
+- dump_dir:  every presented frame is saved as frame_000001.png, ...
+- ring_size: the last N frames are kept in memory (see frames())
+
+Selected with DISPLAY_BACKEND=headless. No window is opened and pygame
+keeps its dummy video driver, so nothing is re-initialised.
+"""
+
+import os
+from collections import deque
+from typing import List, Optional
+
+import pygame
+
+
+class HeadlessWriter:
+    """Drop-in for FramebufferWriter that keeps frames in memory or on disk."""
+
+    device = "headless"
+
+    def __init__(self, width: int, height: int,
+                 dump_dir: Optional[str] = None, ring_size: int = 0):
+        self.render_width = width
+        self.render_height = height
+        self.dump_dir = dump_dir or None
+        self._ring = deque(maxlen=ring_size) if ring_size > 0 else None
+        self.frames_written = 0
+
+        if self.dump_dir:
+            os.makedirs(self.dump_dir, exist_ok=True)
+
+    def write(self, surface: pygame.Surface):
+        """Present a full frame."""
+        self.frames_written += 1
+        if self._ring is not None:
+            self._ring.append(surface.copy())
+        if self.dump_dir:
+            path = os.path.join(self.dump_dir, f"frame_{self.frames_written:06d}.png")
+            try:
+                pygame.image.save(surface, path)
+            except Exception as e:
+                print(f"[Headless] Could not save {path}: {e}")
+
+    def write_rects(self, surface: pygame.Surface, rects: List[pygame.Rect]):
+        """Present a frame. Frames are only ever kept whole, so rects are ignored."""
+        self.write(surface)
+
+    def clear(self, r: int = 0, g: int = 0, b: int = 0):
+        """Nothing is on screen to clear."""
+        pass
+
+    def close(self):
+        """Nothing to release."""
+        pass
+
+    def frames(self) -> List[pygame.Surface]:
+        """The frames held in the ring buffer, oldest first."""
+        return list(self._ring) if self._ring is not None else []
@@ -0,0 +1,121 @@
+"""
+Background Display Presenter
+
+Moves framebuffer output (RGB565 conversion, colour adjustment and the
+write itself) off the Brain thread. Terminal._flip hands finished frames
+to a depth-1 "latest wins" slot; the presenter thread writes whatever is
+newest. If the display is slower than rendering, frames are dropped
+instead of stalling typing or canvas ingestion — the damaged rects of a
+dropped frame are merged into the next one so nothing is lost on screen.
+
+Only used for the direct framebuffer path: SDL windows must be updated
+from the thread that created them.
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+import pygame
+
+
+class Presenter:
+    """
+    Presents frames to a framebuffer writer on a dedicated thread.
+
+    Frames are copied into a small pool of surfaces, so the Terminal can
+    keep drawing on its screen surface while the previous frame is being
+    written out.
+    """
+
+    POOL_SIZE = 3  # one in the slot, one being written, one being filled
+
+    def __init__(self, writer, size):
+        """
+        Args:
+            writer: FramebufferWriter (anything with write_rects(surface, rects))
+            size: (width, height) of the frames that will be submitted
+        """
+        self.writer = writer
+        self._pool: List[pygame.Surface] = [pygame.Surface(size) for _ in range(self.POOL_SIZE)]
+        self._cond = threading.Condition()
+        self._slot = None  # (surface, rects) waiting to be presented
+        self._running = True
+
+        # Metrics
+        self.frames_submitted = 0
+        self.frames_presented = 0
+        self.frames_dropped = 0
+        self.last_present_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="presenter", daemon=True)
+        self._thread.start()
+
+    def submit(self, screen: pygame.Surface, rects: List[pygame.Rect]):
+        """Queue a copy of screen for presentation; replaces any unsent frame."""
+        with self._cond:
+            if not self._running:
+                return
+            surface = self._pool.pop()
+        # Full copy: pool surfaces don't hold the previous frame's pixels
+        surface.blit(screen, (0, 0))
+        rects = [pygame.Rect(r) for r in rects]
+        with self._cond:
+            if self._slot is not None:
+                dropped, dropped_rects = self._slot
+                self._pool.append(dropped)
+                rects = dropped_rects + rects
+                self.frames_dropped += 1
+            self._slot = (surface, rects)
+            self.frames_submitted += 1
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._slot is None and self._running:
+                    self._cond.wait()
+                if self._slot is None:
+                    return  # stopped with nothing left to show
+                surface, rects = self._slot
+                self._slot = None
+
+            start = time.monotonic()
+            try:
+                self.writer.write_rects(surface, rects)
+            except Exception as e:
+                print(f"[Presenter] Write error: {e}")
+            self.last_present_ms = (time.monotonic() - start) * 1000
+
+            with self._cond:
+                self._pool.append(surface)
+                self.frames_presented += 1
+                self._cond.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted frame has been presented or dropped."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._slot is None and len(self._pool) == self.POOL_SIZE,
+                timeout)
+
+    def stop(self, timeout: float = 1.0) -> bool:
+        """Present the pending frame, then stop the thread.
+
+        Returns False if the thread is still running after timeout (stuck
+        in a write); the writer must not be closed under it then.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stats(self) -> dict:
+        """Frame counters for the status API."""
+        return {
+            "submitted": self.frames_submitted,
+            "presented": self.frames_presented,
+            "dropped": self.frames_dropped,
+            "last_present_ms": round(self.last_present_ms, 2),
+        }
@@ -7,23 +7,25 @@ lit/unlit windows. Displayed when the device is off duty.
 
 import math
 import random
-import time
 
 import pygame
 
+from simclock import get_clock
+
 
 class StarryNight:
 
-    def __init__(self, width, height):
+    def __init__(self, width, height, clock=None):
         self.width = width
         self.height = height
-        self.start_time = time.time()
+        self.clock = clock or get_clock()
+        self.start_time = self.clock.time()
 
         self.skyline_points = self._generate_skyline()
         self.stars = self._generate_stars(200)
         self.windows = self._generate_windows()
         self.shooting_star = None
-        self._last_shooting = time.time()
+        self._last_shooting = self.clock.time()
 
     def _generate_skyline(self):
         """Generate city skyline as polygon points along the bottom ~30%."""
@@ -119,7 +121,7 @@ class StarryNight:
 
     def update(self):
         """Update star twinkle and window toggle states."""
-        now = time.time() - self.start_time
+        now = self.clock.time() - self.start_time
 
         # Update star brightness
         for s in self.stars:
@@ -134,7 +136,7 @@ class StarryNight:
 
         # Shooting star (rare)
         if self.shooting_star is None:
-            if time.time() - self._last_shooting > 120 and random.random() < 0.005:
+            if self.clock.time() - self._last_shooting > 120 and random.random() < 0.005:
                 self.shooting_star = {
                     "x": random.randint(50, self.width - 100),
                     "y": random.randint(20, int(self.height * 0.4)),
@@ -149,7 +151,7 @@ class StarryNight:
             ss["life"] += 1
             if ss["life"] >= ss["max_life"]:
                 self.shooting_star = None
-                self._last_shooting = time.time()
+                self._last_shooting = self.clock.time()
 
     def render(self, surface):
         """Draw the screensaver onto the given pygame surface."""
@@ -16,6 +16,7 @@ Layout (480x320):
 import os
 import time
 import random
+from collections import OrderedDict
 from typing import Tuple, Optional, Callable, List
 
 # Force pygame to use dummy driver (we handle display ourselves)
@@ -24,7 +25,15 @@ os.environ["SDL_VIDEODRIVER"] = "dummy"
 import pygame
 
 import config
+from simclock import get_clock
 from .framebuffer import get_writer, IS_FRAMEBUFFER_AVAILABLE
+from .headless import HeadlessWriter
+from .presenter import Presenter
+from .canvas_protocol import (
+    parse_text_command, OP_CLEAR, OP_PIXEL, OP_LINE, OP_RECT, OP_FILLRECT,
+    OP_CIRCLE, OP_FILLCIRCLE, OP_FLIP, OP_BLIT, OP_LINES, OP_POLYLINE,
+    OP_POLYGON, OP_POINTS, OP_FILLRECTS, FULL_FRAME_OPS, PIXEL_HEADER, batch_points,
+)
 
 # Initialize pygame with dummy driver
 PYGAME_AVAILABLE = True
@@ -45,11 +54,15 @@ class Terminal:
     canvas.png as popup window for program output.
     """
 
+    # Rendered text surfaces kept around (LRU) — a full code screen plus
+    # line numbers, sidebar and status text, with room for edits
+    TEXT_CACHE_SIZE = 512
+
     def __init__(self, width: int, height: int,
                  color_bg: Tuple[int, int, int],
                  color_fg: Tuple[int, int, int],
                  font_name: str, font_size: int,
-                 status_bar_height: int = 16):
+                 status_bar_height: int = 16, clock=None):
         self.width = width
         self.height = height
         self.color_bg = color_bg
@@ -58,6 +71,10 @@ class Terminal:
         self.font = None
         self.mock_mode = False
         self.fb_writer = None
+        self.presenter = None
+        # Paces typing, cursor blink and BBS scrolling (see simclock.py);
+        # self.clock is pygame's frame limiter
+        self.sim_clock = clock or get_clock()
 
         # Layout regions from config (scaled for display size)
         self.code_area_x = config.CODE_AREA_X
@@ -106,6 +123,17 @@ class Terminal:
         self.canvas_image = None
         self._load_canvas_assets()
 
+        # Double-buffered canvas: once a program sends FLIP, draws go to
+        # canvas_back and only reach canvas_surface (shown) on the next FLIP
+        self.canvas_back = None
+        self.canvas_frames_presented = 0
+        self.canvas_frames_skipped = 0
+        # Surface views over the halves of the program's shared pixel
+        # buffer (no copy); BLIT names the half to show, and its sequence
+        # number goes into the buffer header once the half is copied
+        self._canvas_pixels = None
+        self._canvas_pixel_header = None
+
         # BBS mode state
         self._bbs_mode = False
         self._bbs_compose_text = ""
@@ -115,11 +143,30 @@ class Terminal:
         self._screensaver_mode = False
 
         # Performance
+        self._text_cache = OrderedDict()  # (text, font, color) -> Surface
+        self._text_cache_hits = 0
+        self._text_cache_misses = 0
+        self._line_num_strip = None
+        self._line_num_strip_key = None
         self.clock = pygame.time.Clock() if PYGAME_AVAILABLE else None
         self._dirty = True
         self._last_flip = 0
         self._min_flip_interval = 0.033  # ~30fps max
 
+        # Damage tracking: _render() recomposes only regions whose content
+        # changed since the last render, found by comparing against what
+        # was drawn. Explicit damage (canvas popup) goes in _damage.
+        self._full_damage = True
+        self._damage: List[pygame.Rect] = []
+        self._canvas_damaged = False
+        self._drawn_lines: List[str] = []
+        self._drawn_first_line = None
+        self._drawn_cursor = None
+        self._drawn_sidebar = None
+        self._drawn_status = None
+        # Damaged rects rendered but not yet sent (rate-limited _flip)
+        self._pending_rects: List[pygame.Rect] = []
+
         self.clear()
 
     def _init_display(self, font_name: str, font_size: int):
@@ -149,12 +196,27 @@ class Terminal:
             self.bg_image.fill((255, 255, 255))
             print(f"[Terminal] No bg.png found, using white background")
 
-        # Initialize framebuffer writer
-        if IS_FRAMEBUFFER_AVAILABLE:
+        # Pick the output backend: auto = framebuffer if present, else window
+        backend = getattr(config, "DISPLAY_BACKEND", "auto")
+        if backend == "auto":
+            backend = "framebuffer" if IS_FRAMEBUFFER_AVAILABLE else "window"
+        elif backend == "framebuffer" and not IS_FRAMEBUFFER_AVAILABLE:
+            print("[Terminal] No framebuffer device, running headless")
+            backend = "headless"
+
+        if backend == "headless":
+            self.fb_writer = HeadlessWriter(
+                self.width, self.height,
+                dump_dir=getattr(config, "HEADLESS_DUMP_DIR", ""),
+                ring_size=getattr(config, "HEADLESS_RING_SIZE", 0))
+            print("[Terminal] Headless display (no window, no framebuffer)")
+        elif backend == "framebuffer":
             self.fb_writer = get_writer(self.width, self.height)
             print(f"[Terminal] Using direct framebuffer: {self.fb_writer.device}")
+            if getattr(config, "DISPLAY_PRESENTER", True):
+                self.presenter = Presenter(self.fb_writer, (self.width, self.height))
         else:
-            print("[Terminal] No framebuffer, using windowed mode")
+            print("[Terminal] Using windowed mode")
             os.environ.pop("SDL_VIDEODRIVER", None)
             pygame.quit()
             pygame.init()
@@ -223,17 +285,35 @@ class Terminal:
         self.canvas_surface = pygame.Surface(
             (config.CANVAS_DRAW_W, config.CANVAS_DRAW_H))
         self.canvas_surface.fill((0, 0, 0))
+        self.canvas_back = None
+        self.canvas_frames_presented = 0
+        self.canvas_frames_skipped = 0
         self.canvas_visible = True
-        self._dirty = True
+        self._damage_rect(self._canvas_window_rect())
         print("[Terminal] Canvas popup shown")
 
     def hide_canvas(self):
         """Hide the canvas popup window."""
         self.canvas_visible = False
         self.canvas_surface = None
-        self._dirty = True
+        self.canvas_back = None
+        self._canvas_pixels = None
+        self._canvas_pixel_header = None
+        self._damage_rect(self._canvas_window_rect())
         print("[Terminal] Canvas popup hidden")
 
+    def attach_pixel_buffer(self, frames, width: int, height: int, header=None):
+        """Use the frames of a shared RGB buffer as the source for BLIT commands.
+
+        header, if given, receives the sequence number of each BLIT drawn
+        (see canvas_protocol.SharedPixelBuffer).
+        """
+        if self.mock_mode:
+            return
+        self._canvas_pixels = [pygame.image.frombuffer(frame, (width, height), "RGB")
+                               for frame in frames]
+        self._canvas_pixel_header = header
+
     def enable_cursor(self):
         """Show the blinking text cursor."""
         self.cursor_enabled = True
@@ -287,7 +367,7 @@ class Terminal:
             if delay_func:
                 delay = delay_func()
                 if delay > 0:
-                    time.sleep(delay)
+                    self.sim_clock.sleep(delay)
                     self._handle_events()
 
     def _newline(self):
@@ -328,7 +408,11 @@ class Terminal:
     # =========================================================================
 
     def _render(self):
-        """Render the full IDE display with optional canvas popup."""
+        """Render the IDE display with optional canvas popup.
+
+        Only damaged regions are recomposed; the damaged rects are
+        handed to the output stage along with the frame.
+        """
         if self.mock_mode:
             return
 
@@ -337,31 +421,146 @@ class Terminal:
             self._flip()
             return
 
-        # 1. Draw background image (title bar, toolbar, borders)
-        self.screen.blit(self.bg_image, (0, 0))
+        damage = self._collect_damage()
+        for rect in damage:
+            self._compose(rect)
+
+        # Single flip to framebuffer
+        self._flip(rects=damage)
 
-        # 2. Render sidebar file list
-        self._render_sidebar()
+    def _compose(self, rect: pygame.Rect):
+        """Redraw every layer that overlaps rect, clipped to rect."""
+        self.screen.set_clip(rect)
 
-        # 3. Render line numbers + code text
-        self._render_code()
+        # 1. Background image (title bar, toolbar, borders)
+        self.screen.blit(self.bg_image, rect, rect)
 
-        # 4. Render cursor
-        self._render_cursor()
+        # 2. Sidebar file list
+        if rect.colliderect(self._sidebar_rect()):
+            self._render_sidebar()
 
-        # 5. Render status bar
-        self._render_status()
+        # 3-4. Line numbers + code text, cursor
+        if rect.colliderect(self._code_rect()):
+            self._render_code()
+            self._render_cursor()
 
-        # 6. Composite canvas popup on top (if visible)
-        if self.canvas_visible and self.canvas_image and self.canvas_surface:
+        # 5. Status bar
+        if rect.colliderect(self._status_rect()):
+            self._render_status()
+
+        # 6. Canvas popup on top (if visible)
+        if (self.canvas_visible and self.canvas_image and self.canvas_surface
+                and rect.colliderect(self._canvas_window_rect())):
             self.screen.blit(self.canvas_image,
                              (config.CANVAS_X, config.CANVAS_Y))
             self.screen.blit(self.canvas_surface,
                              (config.CANVAS_X + config.CANVAS_DRAW_OFFSET_X,
                               config.CANVAS_Y + config.CANVAS_DRAW_OFFSET_Y))
 
-        # 7. Single flip to framebuffer
-        self._flip()
+        self.screen.set_clip(None)
+
+    # -------------------------------------------------------------------------
+    # Damage tracking
+    # -------------------------------------------------------------------------
+
+    def _damage_rect(self, rect: pygame.Rect):
+        """Mark a screen region for recomposition on the next _render()."""
+        self._damage.append(pygame.Rect(rect))
+        self._dirty = True
+
+    def _damage_all(self):
+        """Recompose the whole screen on the next _render()."""
+        self._full_damage = True
+        self._dirty = True
+
+    def _collect_damage(self) -> List[pygame.Rect]:
+        """Regions that changed since the last render, as screen rects."""
+        screen_rect = self.screen.get_rect()
+        damage = self._damage
+        self._damage = []
+
+        sidebar = (tuple(self.sidebar_files), self.sidebar_current)
+        if sidebar != self._drawn_sidebar:
+            damage.append(self._sidebar_rect())
+            self._drawn_sidebar = sidebar
+
+        status = (self.current_model, self.current_state,
+                  self.current_mood, self._online_count)
+        if status != self._drawn_status:
+            damage.append(self._status_rect())
+            self._drawn_status = status
+
+        first_line = max(0, self.line_offset - self.cursor_y)
+        if (first_line != self._drawn_first_line
+                or len(self.lines) != len(self._drawn_lines)):
+            damage.append(self._code_rect())  # scrolled
+        else:
+            for row, line in enumerate(self.lines):
+                if line != self._drawn_lines[row]:
+                    damage.append(self._code_row_rect(row))
+        self._drawn_lines = list(self.lines)
+        self._drawn_first_line = first_line
+
+        cursor = (self.cursor_x, self.cursor_y,
+                  self.cursor_enabled and self.cursor_visible)
+        if cursor != self._drawn_cursor:
+            if self._drawn_cursor is not None:
+                damage.append(self._cursor_rect(*self._drawn_cursor[:2]))
+            damage.append(self._cursor_rect(self.cursor_x, self.cursor_y))
+            self._drawn_cursor = cursor
+
+        if self._canvas_damaged and self.canvas_visible:
+            damage.append(self._canvas_draw_rect())
+        self._canvas_damaged = False
+
+        if self._full_damage:
+            self._full_damage = False
+            return [screen_rect]
+
+        # Clip to the screen and drop rects inside another damaged rect
+        rects = []
+        for rect in sorted((r.clip(screen_rect) for r in damage),
+                           key=lambda r: r.w * r.h, reverse=True):
+            if rect.w and rect.h and not any(o.contains(rect) for o in rects):
+                rects.append(rect)
+        return rects
+
+    def _sidebar_rect(self) -> pygame.Rect:
+        # Extends to the line-number gutter in case a file name overhangs
+        return pygame.Rect(self.sidebar_x, self.sidebar_y - 1,
+                           max(self.sidebar_w, self.line_num_x - self.sidebar_x),
+                           self.sidebar_h + 2)
+
+    def _code_rect(self) -> pygame.Rect:
+        x = min(self.line_num_x, self.code_area_x)
+        return pygame.Rect(x, self.code_area_y,
+                           self.code_area_x + self.code_area_w - x, self.code_area_h)
+
+    def _code_row_rect(self, row: int) -> pygame.Rect:
+        rect = self._code_rect()
+        return pygame.Rect(rect.x, self.code_area_y + row * self.char_height,
+                           rect.w, self.char_height)
+
+    def _cursor_rect(self, col: int, row: int) -> pygame.Rect:
+        return pygame.Rect(self.code_area_x + col * self.char_width,
+                           self.code_area_y + row * self.char_height,
+                           self.char_width, self.char_height)
+
+    def _status_rect(self) -> pygame.Rect:
+        # Status text sits a couple of pixels above STATUS_BAR_Y on small layouts
+        y = self.status_bar_y - 2
+        return pygame.Rect(0, y, self.width, self.height - y)
+
+    def _canvas_window_rect(self) -> pygame.Rect:
+        if self.canvas_image:
+            return pygame.Rect((config.CANVAS_X, config.CANVAS_Y),
+                               self.canvas_image.get_size())
+        return self._canvas_draw_rect()
+
+    def _canvas_draw_rect(self) -> pygame.Rect:
+        return pygame.Rect(config.CANVAS_X + config.CANVAS_DRAW_OFFSET_X,
+                           config.CANVAS_Y + config.CANVAS_DRAW_OFFSET_Y,
+                           config.CANVAS_DRAW_W, config.CANVAS_DRAW_H)
 
     def _render_sidebar(self):
         """Render the file list in the sidebar."""
@@ -384,11 +583,11 @@ class Terminal:
                     self.sidebar_x, y - 1,
                     self.sidebar_w, sidebar_font_size + 3)
                 pygame.draw.rect(self.screen, (0, 0, 0), sel_rect)
-                txt = self.font_bold.render(
-                    display_name, True, (255, 255, 255))
+                txt = self._text_surface(
+                    display_name, self.font_bold, (255, 255, 255))
             else:
-                txt = self.font.render(
-                    display_name, True, (0, 0, 0))
+                txt = self._text_surface(
+                    display_name, self.font, (0, 0, 0))
 
             self.screen.blit(txt, (self.sidebar_x + 3, y))
             y += sidebar_font_size + 4
@@ -396,6 +595,8 @@ class Terminal:
     def _render_code(self):
         """Render line numbers and code text in the code area."""
         total_lines_before = max(0, self.line_offset - self.cursor_y)
+        self.screen.blit(self._line_number_strip(total_lines_before + 1),
+                         (self.line_num_x, self.code_area_y))
 
         for row, line in enumerate(self.lines):
             y = self.code_area_y + row * self.char_height
@@ -403,18 +604,54 @@ class Terminal:
             if y + self.char_height > self.code_area_y + self.code_area_h:
                 break
 
-            line_num = total_lines_before + row + 1
-            ln_text = f"{line_num:3d}"
-            ln_surface = self.font.render(ln_text, True, (128, 128, 128))
-            self.screen.blit(ln_surface, (self.line_num_x, y))
-
             if line:
                 max_chars = self.cols
                 display_line = line[:max_chars]
-                txt_surface = self.font.render(
-                    display_line, True, self.color_fg)
+                txt_surface = self._text_surface(
+                    display_line, self.font, self.color_fg)
                 self.screen.blit(txt_surface, (self.code_area_x, y))
 
+    def _line_number_strip(self, first: int) -> pygame.Surface:
+        """Line numbers for every visible row as one transparent surface.
+
+        Rebuilt only when the first visible line number changes (scroll).
+        """
+        visible = min(self.rows, self.code_area_h // self.char_height)
+        key = (first, visible)
+        if self._line_num_strip_key != key:
+            # Wide enough for the last number: 5+ digit lines must not clip
+            digits = max(3, len(str(first + visible - 1)))
+            strip = pygame.Surface(
+                (self.char_width * (digits + 1), visible * self.char_height), pygame.SRCALPHA)
+            for row in range(visible):
+                ln_surface = self._text_surface(
+                    f"{first + row:3d}", self.font, (128, 128, 128))
+                # Glyphs don't overlap: copy them as-is, alpha included
+                strip.blit(ln_surface, (0, row * self.char_height),
+                           special_flags=pygame.BLEND_RGBA_MAX)
+            self._line_num_strip = strip
+            self._line_num_strip_key = key
+        return self._line_num_strip
+
+    def _text_surface(self, text: str, font, color) -> pygame.Surface:
+        """Render text through the LRU surface cache.
+
+        Typing a character changes one line; every other line, line
+        number and status string comes back from the cache.
+        """
+        key = (text, font, tuple(color))
+        surface = self._text_cache.get(key)
+        if surface is not None:
+            self._text_cache.move_to_end(key)
+            self._text_cache_hits += 1
+            return surface
+        self._text_cache_misses += 1
+        surface = font.render(text, True, color)
+        self._text_cache[key] = surface
+        if len(self._text_cache) > self.TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return surface
+
     def _render_cursor(self):
         """Render the blinking cursor in the code area."""
         if self.cursor_enabled and self.cursor_visible:
@@ -433,7 +670,7 @@ class Terminal:
         if self.current_mood:
             status += f" | Mood: {self.current_mood}"
 
-        st_surface = self.font_bold.render(status, True, (0, 0, 0))
+        st_surface = self._text_surface(status, self.font_bold, (0, 0, 0))
         # Shift status text left by 210px (at 800w), scaled for other resolutions
         shift = int(210 * config.DISPLAY_WIDTH / 800)
         status_x = self.code_area_x + 30 - shift
@@ -443,7 +680,7 @@ class Terminal:
 
         # Online count (right-aligned)
         online_text = f"{self._online_count} Online"
-        online_surface = self.font_bold.render(online_text, True, (0, 0, 0))
+        online_surface = self._text_surface(online_text, self.font_bold, (0, 0, 0))
         online_x = config.DISPLAY_WIDTH - online_surface.get_width() - int(22 * config._SX)
         self.screen.blit(online_surface, (online_x, status_y))
 
@@ -456,20 +693,36 @@ class Terminal:
     # Framebuffer output
     # =========================================================================
 
-    def _flip(self, force: bool = False):
-        """Send the rendered surface to the display. Rate-limited."""
+    def _flip(self, force: bool = False, rects: Optional[List[pygame.Rect]] = None):
+        """Send the rendered surface to the display. Rate-limited.
+
+        rects limits the update to those regions; None means the whole
+        screen changed. Regions from rate-limited calls are kept and sent
+        with the next flip that goes through.
+        """
+        if rects is None:
+            rects = [self.screen.get_rect()]
+        self._pending_rects.extend(rects)
+
         now = time.time()
         if not force and (now - self._last_flip) < self._min_flip_interval:
             return
 
         self._last_flip = now
         self._dirty = False
-
-        if self.fb_writer:
-            self.fb_writer.write(self.screen)
+        rects = self._pending_rects
+        self._pending_rects = []
+        if not rects:
+            return  # nothing changed since the last flip
+
+        if self.presenter:
+            self.presenter.submit(self.screen, rects)
+        elif self.fb_writer:
+            self.fb_writer.write_rects(self.screen, rects)
         elif hasattr(self, '_window'):
-            self._window.blit(self.screen, (0, 0))
-            pygame.display.flip()
+            for rect in rects:
+                self._window.blit(self.screen, rect, rect)
+            pygame.display.update(rects)
 
         # Push frame to web stream (only when streaming is enabled)
         if config.WEB_STREAM_ENABLED:
@@ -484,58 +737,165 @@ class Terminal:
     # =========================================================================
 
     def process_draw_command(self, cmd_str: str):
-        """Process drawing commands onto the canvas surface (not the screen).
+        """Process a text "CMD:" drawing command onto the canvas surface.
 
         Commands are drawn to self.canvas_surface and composited during
         _render(). No direct _flip() call — avoids tearing on SPI display.
         """
         if self.mock_mode or not cmd_str.startswith("CMD:"):
             return
-        if self.canvas_surface is None:
+
+        record = parse_text_command(cmd_str)
+        if record is not None:
+            self.process_draw_records([record])
+
+    def process_draw_records(self, records):
+        """Process a batch of decoded draw records onto the canvas.
+
+        When the batch already holds a later full-canvas CLEAR/BLIT, everything
+        before it would be painted over before the next _render() — those
+        frames are skipped without drawing them.
+        """
+        if self.mock_mode or self.canvas_surface is None or not records:
             return
 
-        target = self.canvas_surface
+        start = self._first_visible_record(records)
+        if start:
+            skipped = sum(1 for rec in records[:start] if rec[0] == OP_FLIP)
+            if skipped and self.canvas_back is None and config.CANVAS_DOUBLE_BUFFER:
+                self._enable_canvas_back()
+            self.canvas_frames_skipped += skipped
+
+        for i in range(start, len(records)):
+            record = records[i]
+            if record[0] == OP_FLIP:
+                self._present_canvas()
+            else:
+                target = self.canvas_back or self.canvas_surface
+                self._draw_record(target, record)
+                if self.canvas_back is None:
+                    # Will be composited on next _render()
+                    self._canvas_damaged = True
+                    self._dirty = True
+
+    def _first_visible_record(self, records) -> int:
+        """Index of the first record whose result can still be seen.
+
+        Single-buffered, that's the last CLEAR/BLIT in the batch.
+        Double-buffered, it's the last one before the last FLIP — a CLEAR
+        after that FLIP starts a frame that hasn't been presented yet.
+        """
+        limit = len(records)
+        if self.canvas_back is not None or any(r[0] == OP_FLIP for r in records):
+            limit = 0
+            for i in range(len(records) - 1, -1, -1):
+                if records[i][0] == OP_FLIP:
+                    limit = i
+                    break
+        for i in range(limit - 1, 0, -1):
+            if records[i][0] in FULL_FRAME_OPS:
+                return i
+        return 0
+
+    def _enable_canvas_back(self):
+        """Switch the canvas to double-buffered mode."""
+        self.canvas_back = self.canvas_surface.copy()
+
+    def _present_canvas(self):
+        """FLIP: copy the back surface to the visible canvas."""
+        if self.canvas_back is None:
+            if not config.CANVAS_DOUBLE_BUFFER:
+                self._canvas_damaged = True
+                self._dirty = True
+                return
+            # First FLIP: everything so far was drawn straight to the
+            # visible surface. From now on, draw behind it.
+            self._enable_canvas_back()
+        else:
+            self.canvas_surface.blit(self.canvas_back, (0, 0))
+        self.canvas_frames_presented += 1
+        self._canvas_damaged = True
+        self._dirty = True
 
+    def _draw_record(self, target, record):
+        """Draw one (opcode, a, b, c, d, r, g, b[, items]) record onto target."""
+        op, a, b, c, d = record[:5]
+        color = record[5:8]
         try:
-            parts = cmd_str.strip().split(':')[1].split(',')
-            c = parts[0]
-            args = [int(x) for x in parts[1:]]
-            if c == "CLEAR":
-                target.fill(tuple(args[:3]))
-            elif c == "PIXEL":
-                target.set_at((args[0], args[1]), tuple(args[2:]))
-            elif c == "LINE":
-                pygame.draw.line(
-                    target, tuple(args[4:]),
-                    (args[0], args[1]), (args[2], args[3]))
-            elif c == "RECT":
-                pygame.draw.rect(
-                    target, tuple(args[4:]),
-                    (args[0], args[1], args[2], args[3]), 1)
-            elif c == "FILLRECT":
-                pygame.draw.rect(
-                    target, tuple(args[4:]),
-                    (args[0], args[1], args[2], args[3]))
-            elif c == "CIRCLE":
-                pygame.draw.circle(
-                    target, tuple(args[3:]),
-                    (args[0], args[1]), args[2], 1)
-            elif c == "FILLCIRCLE":
-                pygame.draw.circle(
-                    target, tuple(args[3:]),
-                    (args[0], args[1]), args[2])
-            self._dirty = True  # Will be composited on next _render()
-        except Exception as e:
+            if op == OP_CLEAR:
+                target.fill(color)
+            elif op == OP_PIXEL:
+                target.set_at((a, b), color)
+            elif op == OP_LINE:
+                pygame.draw.line(target, color, (a, b), (c, d))
+            elif op == OP_RECT:
+                pygame.draw.rect(target, color, (a, b, c, d), 1)
+            elif op == OP_FILLRECT:
+                pygame.draw.rect(target, color, (a, b, c, d))
+            elif op == OP_CIRCLE:
+                pygame.draw.circle(target, color, (a, b), c, 1)
+            elif op == OP_FILLCIRCLE:
+                pygame.draw.circle(target, color, (a, b), c)
+            elif op == OP_BLIT:
+                if self._canvas_pixels:
+                    target.blit(self._canvas_pixels[a % len(self._canvas_pixels)], (0, 0))
+                    if self._canvas_pixel_header is not None:
+                        PIXEL_HEADER.pack_into(self._canvas_pixel_header, 0, b)
+            elif op == OP_POLYLINE:
+                points = batch_points(record)
+                if len(points) >= 2:
+                    pygame.draw.lines(target, color, bool(b), points)
+            elif op == OP_POLYGON:
+                points = batch_points(record)
+                if len(points) >= 3:
+                    pygame.draw.polygon(target, color, points, 0 if b else 1)
+            elif op == OP_LINES:
+                line = pygame.draw.line
+                for item in record[8]:
+                    line(target, item[5:], item[1:3], item[3:5])
+            elif op == OP_POINTS:
+                self._draw_points(target, record[8])
+            elif op == OP_FILLRECTS:
+                fill = target.fill
+                for item in record[8]:
+                    fill(item[5:], item[1:5])
+        except Exception:
             pass  # Silently ignore malformed commands
 
+    def _draw_points(self, target, items):
+        """Plot a POINTS batch through one PixelArray lock."""
+        w, h = target.get_size()
+        pixels = pygame.PixelArray(target)
+        try:
+            for item in items:
+                x = item[1]
+                y = item[2]
+                if 0 <= x < w and 0 <= y < h:
+                    pixels[x, y] = item[5:]
+        finally:
+            pixels.close()
+
+    def display_stats(self) -> Optional[dict]:
+        """Presenter frame counters (None when frames are written inline)."""
+        return self.presenter.stats() if self.presenter else None
+
+    def canvas_stats(self) -> dict:
+        """Frame counters for the current canvas session."""
+        return {
+            "double_buffered": self.canvas_back is not None,
+            "frames_presented": self.canvas_frames_presented,
+            "frames_skipped": self.canvas_frames_skipped,
+        }
+
     # =========================================================================
     # Event handling and tick
     # =========================================================================
 
     def update_cursor_blink(self):
-        if time.time() - self.cursor_blink_time > 0.5:
+        now = self.sim_clock.time()
+        if now - self.cursor_blink_time > 0.5:
             self.cursor_visible = not self.cursor_visible
-            self.cursor_blink_time = time.time()
+            self.cursor_blink_time = now
             self._dirty = True
 
     def _handle_events(self):
@@ -553,13 +913,19 @@ class Terminal:
         self.update_cursor_blink()
         if self._dirty:
             self._render()
-        if self.clock:
+        if self.sim_clock.fast_forward:
+            self.sim_clock.sleep(1.0 / fps)
+        elif self.clock:
             self.clock.tick(fps)
 
     def shutdown(self):
         if PYGAME_AVAILABLE and not self.mock_mode:
-            if self.fb_writer:
+            stopped = self.presenter.stop() if self.presenter else True
+            if not stopped:
+                print("[Terminal] Presenter still writing, leaving the framebuffer open")
+            elif self.fb_writer:
                 self.fb_writer.clear(0, 0, 0)
+                self.fb_writer.close()
             pygame.quit()
 
     def check_ghosting_refresh(self):
@@ -582,6 +948,7 @@ class Terminal:
         if not self.mock_mode and self.bg_image:
             self.screen.blit(self.bg_image, (0, 0))
             self._flip(force=True)
+        self._damage_all()
 
     def flush(self):
         """Push the current screen surface to the display."""
@@ -685,9 +1052,9 @@ class Terminal:
     def exit_bbs_mode(self):
         """Switch back to IDE display."""
         self._bbs_mode = False
+        self._damage_all()
         if not self.mock_mode and self.bg_image:
             self.screen.blit(self.bg_image, (0, 0))
-            self._dirty = True
 
     def _render_bbs_chrome(self):
         """Draw the bg, terminal chrome, and fill draw area with BBS bg color."""
@@ -782,7 +1149,7 @@ class Terminal:
             return
 
         # Pause on first screenful
-        time.sleep(random.uniform(2.0, 3.5))
+        self.sim_clock.sleep(random.uniform(2.0, 3.5))
 
         # Find post boundaries (lines tagged "post_break")
         post_breaks = {i for i, (_, key) in enumerate(lines) if key == "post_break"}
@@ -798,12 +1165,12 @@ class Terminal:
             # Check if a post break just scrolled into view
             visible_end = offset + visible_rows - 1
             if visible_end in post_breaks:
-                time.sleep(8.0)
+                self.sim_clock.sleep(8.0)
             else:
-                time.sleep(random.uniform(0.15, 0.35))
+                self.sim_clock.sleep(random.uniform(0.15, 0.35))
 
         # Pause on last screenful
-        time.sleep(random.uniform(1.5, 3.0))
+        self.sim_clock.sleep(random.uniform(1.5, 3.0))
 
     def _bbs_draw_title(self, title, colors, lx):
         """Draw the pinned board title at the top of the content area."""
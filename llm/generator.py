@@ -9,8 +9,11 @@ import json
 import os
 import random
 import requests
+import threading
 import time
-from typing import Generator, Optional
+from typing import Generator, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
 
 import config
 
@@ -36,6 +39,13 @@ AVAILABLE_MODELS = {
 # Ollama endpoint (can override via env)
 OLLAMA_ENDPOINT = os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434")
 
+# OpenRouter API base (override to point at llm/stub_server.py for benchmarks)
+OPENROUTER_ENDPOINT = os.environ.get("OPENROUTER_ENDPOINT", "https://openrouter.ai/api/v1")
+
+# Keep-alive pool per backend: one stream at a time normally, a little
+# headroom for overlapping requests (warm-up, BBS calls)
+HTTP_POOL_SIZE = 4
+
 # Special modes for random model selection
 SURPRISE_ME = "surprise_me"
 SURPRISE_ME_LOCAL = "surprise_me_local"
@@ -82,6 +92,9 @@ class LLMGenerator:
         self.model_name = model_name or DEFAULT_MODEL     # Actual model to use
         self._last_request_time = 0
         self.current_seed = None  # Seed for current program
+        self._sessions = {}  # backend -> requests.Session (keep-alive pool)
+        self._sessions_lock = threading.Lock()
+        self.last_first_token_ms = None  # time to first token of the last stream
 
         # If surprise mode, pick a random model now
         if self.model_setting == SURPRISE_ME:
@@ -89,22 +102,66 @@ class LLMGenerator:
         elif self.model_setting == SURPRISE_ME_LOCAL:
             self._pick_random_local_model()
 
-    def _pick_random_cloud_model(self):
-        """Pick a random cloud model (exclude local ollama models)."""
+    def _session(self, backend: str) -> requests.Session:
+        """Long-lived session for a backend ("openrouter" or "ollama").
+
+        Reusing it keeps the TCP/TLS connection open between requests, so
+        only the first request of a session pays for the handshake.
+        """
+        with self._sessions_lock:
+            session = self._sessions.get(backend)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[backend] = session
+            return session
+
+    def warm_up(self):
+        """Open the connection to the current backend in the background.
+
+        Called on boot and when a new program starts, so the handshake
+        overlaps with the thinking pause instead of delaying the first token.
+        """
+        if self.model_name.startswith("ollama/"):
+            backend, url = "ollama", f"{OLLAMA_ENDPOINT.rstrip('/')}/api/tags"
+        else:
+            backend, url = "openrouter", OPENROUTER_ENDPOINT
+
+        def run():
+            try:
+                # Any response will do; the pooled connection is what we want
+                self._session(backend).head(url, timeout=5).close()
+            except requests.RequestException as e:
+                print(f"[LLM] Warm-up failed ({backend}): {e}")
+
+        threading.Thread(target=run, name="llm-warmup", daemon=True).start()
+
+    def _random_cloud_model(self) -> str:
+        """Choose a random cloud model (exclude local ollama models)."""
         cloud_models = [k for k in AVAILABLE_MODELS.keys() if not k.startswith("ollama/")]
-        self.model_name = random.choice(cloud_models)
-        print(f"[LLM] Surprise! Selected: {self.get_short_name()}")
+        model = random.choice(cloud_models)
+        print(f"[LLM] Surprise! Selected: {AVAILABLE_MODELS[model][1]}")
+        return model
 
-    def _pick_random_local_model(self):
-        """Pick a random locally available Ollama model."""
+    def _random_local_model(self) -> str:
+        """Choose a random locally available Ollama model."""
         available, models = detect_ollama_models()
         if available and models:
             raw = random.choice(models)
-            self.model_name = f"ollama/{raw}"
             print(f"[LLM] Surprise (local)! Selected: {raw}")
-        else:
-            print("[LLM] No local models available, falling back to cloud")
-            self._pick_random_cloud_model()
+            return f"ollama/{raw}"
+        print("[LLM] No local models available, falling back to cloud")
+        return self._random_cloud_model()
+
+    def _pick_random_cloud_model(self):
+        """Pick a random cloud model (exclude local ollama models)."""
+        self.model_name = self._random_cloud_model()
+
+    def _pick_random_local_model(self):
+        """Pick a random locally available Ollama model."""
+        self.model_name = self._random_local_model()
 
     def set_model(self, model_name: str):
         """Change the current model (or set to a surprise mode)."""
@@ -124,16 +181,32 @@ class LLMGenerator:
         else:
             print(f"[LLM] Unknown model: {model_name}, keeping {self.model_name}")
 
-    def select_for_new_program(self):
-        """Called when starting a new program - picks random model and new seed."""
-        # New seed for new program
-        self.current_seed = random.randint(0, 2147483647)
-        print(f"[LLM] New seed: {self.current_seed}")
+    def pick_next(self) -> Tuple[str, int]:
+        """Choose (model, seed) for a new program without switching to them.
 
+        Lets the next program be generated ahead of time with the model and
+        seed it will be credited to (see programmer/prefetch.py).
+        """
+        seed = random.randint(0, 2147483647)
         if self.model_setting == SURPRISE_ME:
-            self._pick_random_cloud_model()
+            model = self._random_cloud_model()
         elif self.model_setting == SURPRISE_ME_LOCAL:
-            self._pick_random_local_model()
+            model = self._random_local_model()
+        else:
+            model = self.model_name
+        return model, seed
+
+    def select_for_new_program(self, model: str = None, seed: int = None):
+        """Called when starting a new program - picks random model and new seed.
+
+        model/seed adopt a choice made earlier with pick_next().
+        """
+        if model is None:
+            model, seed = self.pick_next()
+        self.model_name = model
+        self.current_seed = seed
+        print(f"[LLM] New seed: {self.current_seed}")
+        self.warm_up()
 
     def get_current_model(self) -> str:
         """Get the current model setting (may be 'surprise_me')."""
@@ -159,20 +232,33 @@ class LLMGenerator:
         return models
 
     def stream(self, prompt: str, max_tokens: int = 1024,
-               temperature: float = 0.7, stop: list = None) -> Generator[str, None, None]:
+               temperature: float = 0.7, stop: list = None,
+               model: str = None, seed: int = None) -> Generator[str, None, None]:
         """
         Stream text completion token by token.
         Routes to OpenRouter (cloud) or Ollama (local) based on model prefix.
+        model/seed override the current model and seed for this request only.
         """
-        if self.model_name.startswith("ollama/"):
-            yield from self._stream_ollama(prompt, max_tokens, temperature, stop)
+        model = model or self.model_name
+        if seed is None:
+            seed = self.current_seed
+        if model.startswith("ollama/"):
+            tokens = self._stream_ollama(prompt, max_tokens, temperature, stop, model)
         else:
-            yield from self._stream_openrouter(prompt, max_tokens, temperature, stop)
-
-    def _stream_openrouter(self, prompt: str, max_tokens: int,
-                           temperature: float, stop: list) -> Generator[str, None, None]:
+            tokens = self._stream_openrouter(prompt, max_tokens, temperature, stop, model, seed)
+
+        start = time.monotonic()
+        self.last_first_token_ms = None
+        for token in tokens:
+            if self.last_first_token_ms is None:
+                self.last_first_token_ms = (time.monotonic() - start) * 1000
+                print(f"[LLM] First token after {self.last_first_token_ms:.0f}ms")
+            yield token
+
+    def _stream_openrouter(self, prompt: str, max_tokens: int, temperature: float,
+                           stop: list, model: str, seed: Optional[int]) -> Generator[str, None, None]:
         """Stream from OpenRouter API (OpenAI-compatible)."""
-        url = "https://openrouter.ai/api/v1/chat/completions"
+        url = f"{OPENROUTER_ENDPOINT.rstrip('/')}/chat/completions"
 
         headers = {
             "Content-Type": "application/json",
@@ -182,7 +268,7 @@ class LLMGenerator:
         }
 
         data = {
-            "model": self.model_name,
+            "model": model,
             "max_tokens": max_tokens,
             "temperature": temperature,
             "reasoning": {"exclude": True},  # Skip reasoning for faster response
@@ -193,16 +279,17 @@ class LLMGenerator:
         }
 
         # Add seed if set (same seed for retries, new seed for new programs)
-        if self.current_seed is not None:
-            data["seed"] = self.current_seed
+        if seed is not None:
+            data["seed"] = seed
 
         if stop:
             data["stop"] = stop
 
-        print(f"[LLM] Sending request to OpenRouter ({self.model_name}) [seed: {self.current_seed}]")
+        print(f"[LLM] Sending request to OpenRouter ({model}) [seed: {seed}]")
 
         try:
-            with requests.post(url, headers=headers, json=data, stream=True, timeout=(10, 30)) as response:
+            with self._session("openrouter").post(url, headers=headers, json=data, stream=True,
+                                                  timeout=(10, 30)) as response:
                 # Check for API errors
                 if response.status_code == 529:
                     raise Exception("Oh no! My brain is fried! (err: 529 overloaded)")
@@ -221,7 +308,9 @@ class LLMGenerator:
                         if decoded.startswith('data: '):
                             data_str = decoded[6:]
                             if data_str == '[DONE]':
-                                break
+                                # Keep reading to the end of the body so the
+                                # connection goes back to the pool
+                                continue
                             try:
                                 chunk = json.loads(data_str)
                                 choices = chunk.get('choices', [])
@@ -248,11 +337,11 @@ class LLMGenerator:
             print(f"[LLM] Error streaming from OpenRouter: {e}")
             raise
 
-    def _stream_ollama(self, prompt: str, max_tokens: int,
-                       temperature: float, stop: list) -> Generator[str, None, None]:
+    def _stream_ollama(self, prompt: str, max_tokens: int, temperature: float,
+                       stop: list, model: str) -> Generator[str, None, None]:
         """Stream from local Ollama server."""
         # Extract model name (remove "ollama/" prefix)
-        model = self.model_name.replace("ollama/", "")
+        model = model.replace("ollama/", "")
         url = f"{OLLAMA_ENDPOINT}/api/generate"
 
         data = {
@@ -272,7 +361,8 @@ class LLMGenerator:
         print(f"[LLM] Sending request to Ollama ({model})")
 
         try:
-            with requests.post(url, json=data, stream=True, timeout=(10, 120)) as response:
+            with self._session("ollama").post(url, json=data, stream=True,
+                                              timeout=(10, 120)) as response:
                 if response.status_code != 200:
                     raise Exception(f"Ollama error! (err: {response.status_code})")
 
@@ -284,7 +374,7 @@ class LLMGenerator:
                             if text:
                                 yield text
                             if chunk.get('done', False):
-                                break
+                                continue  # read to the end; keeps the connection
                         except json.JSONDecodeError:
                             pass
         except requests.exceptions.ConnectionError:
@@ -304,7 +394,8 @@ class LLMGenerator:
             base += "from tiny_plot3d import Plot3D\n\np = Plot3D(c)\n"
         return base
 
-    def build_prompt(self, program_type: str, mood: str, lessons: str = "", creative: dict = None) -> str:
+    def build_prompt(self, program_type: str, mood: str, lessons: str = "", creative: dict = None,
+                     model: str = None) -> str:
         """
         Build a prompt for generating a specific type of program.
 
@@ -315,13 +406,14 @@ class LLMGenerator:
             creative: dict from creativity.pick_creative_dimensions() with
                       style, palette, inspiration_seed, directive keys.
                       If None, falls back to the plain prompt.
+            model: model the prompt is for (defaults to the current model)
         """
         # Special case: wireframe_plot uses the Plot3D helper
         if program_type == "wireframe_plot":
             return self._build_wireframe_prompt(lessons)
 
         # Local Ollama models get a stripped-down prompt (weak instruction following)
-        if self.model_name.startswith("ollama/"):
+        if (model or self.model_name).startswith("ollama/"):
             return self._build_simple_prompt(program_type, creative)
 
         description = _resolve_description(program_type)
@@ -374,6 +466,20 @@ class LLMGenerator:
             "  c.circle(x,y,radius,r,g,b)\n"
             "  c.fill_circle(x,y,radius,r,g,b)\n"
             "  c.sleep(seconds)\n"
+            "Batch versions (one call for many shapes - use them for\n"
+            "particles, meshes and grids instead of drawing in a loop):\n"
+            "  c.lines([(x1,y1,x2,y2), ...], r,g,b)\n"
+            "  c.polyline([(x,y), ...], r,g,b, closed=False)\n"
+            "  c.polygon([(x,y), ...], r,g,b)\n"
+            "  c.fill_polygon([(x,y), ...], r,g,b)\n"
+            "  c.points([(x,y), ...], r,g,b)\n"
+            "  c.fill_rects([(x,y,w,h), ...], r,g,b)\n"
+            "  (items in lines/points/fill_rects may add their own r,g,b)\n"
+            "For per-pixel effects (plasma, fire) draw into a pixel buffer\n"
+            "instead of calling c.pixel() for every pixel:\n"
+            "  buf = c.pixel_buffer()  # once, before the loop\n"
+            "  buf.set(x,y,r,g,b) / buf.set_row(y, bytes) / buf.fill(r,g,b)\n"
+            "  c.blit()  # once per frame, before c.sleep()\n"
             "Do NOT use any other methods.\n\n"
             "Output ONLY Python code. No markdown, no explanation.\n"
         )
@@ -469,6 +575,8 @@ class LLMGenerator:
             "  c.fill_rect(x,y,w,h,r,g,b)\n"
             "  c.circle(x,y,radius,r,g,b)\n"
             "  c.fill_circle(x,y,radius,r,g,b)\n"
+            "  c.lines([(x1,y1,x2,y2), ...], r,g,b)\n"
+            "  c.points([(x,y), ...], r,g,b)\n"
             "  c.sleep(seconds)\n"
             "Do NOT use any other methods.\n\n"
             "Output ONLY Python code. No markdown, no explanation.\n"
@@ -495,12 +603,21 @@ class LLMGenerator:
         )
         return prompt
 
-    def build_fix_prompt(self, code: str, error: str) -> str:
-        """Build a prompt to fix broken code."""
+    def build_fix_prompt(self, code: str, error: str, diagnostics=None) -> str:
+        """Build a prompt to fix broken code.
+
+        diagnostics: optional programmer.validator Diagnostics, listed line
+        by line so every problem gets fixed in one round trip.
+        """
+        problems = ""
+        if diagnostics:
+            problems = "Problems found:\n" + "".join(
+                f"- {d.severity} {d}\n" for d in diagnostics) + "\n"
         prompt = (
             "The following Python script failed:\n\n"
             f"{code}\n\n"
             f"Error: {error}\n\n"
+            f"{problems}"
             "FIX IT. Write ONLY the fixed code.\n"
             "NO explanations. NO markdown.\n"
             "Constraints:\n"
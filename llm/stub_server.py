@@ -0,0 +1,381 @@
+"""
+Local LLM Stub Server
+
+Stands in for OpenRouter and Ollama so the write/fix/reflect pipeline can
+be benchmarked without paying for tokens or depending on the network.
+Code requests are answered by replaying archived programs from
+programs/programs/; lesson and BBS prompts get short canned replies.
+
+Speaks:
+- OpenRouter (OpenAI chat):  POST /api/v1/chat/completions  (SSE stream)
+- Ollama:                    POST /api/generate             (NDJSON stream)
+                             GET  /api/tags
+
+Token rate, time to first token and error rate are configurable, and a
+fixed --seed makes runs reproducible.
+
+Usage:
+    python -m llm.stub_server --port 8765 --tokens-per-sec 40 --latency 0.5
+
+    OPENROUTER_ENDPOINT=http://127.0.0.1:8765/api/v1 \\
+    OLLAMA_ENDPOINT=http://127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional
+
+DEFAULT_PROGRAMS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "programs", "programs")
+
+STUB_MODEL = "stub:latest"
+
+# Status codes the real backends return when things go wrong
+ERROR_STATUSES = (429, 500, 529)
+
+PROSE_REPLIES = [
+    "Always initialize variables before the loop.",
+    "Keep every coordinate inside the canvas bounds.",
+    "Call c.sleep() once per frame so the animation stays smooth.",
+    "tiny experiment with falling dots",
+    "just watched the stars for a bit, feeling good",
+]
+
+# Words with their trailing whitespace, or runs of whitespace — close
+# enough to real tokenizer chunks for pacing purposes
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up mid-stream all the time (WRITE stops at the end
+        # of the code block); that's not worth a traceback
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def _load_programs(programs_dir: str, successful_only: bool) -> List[str]:
+    """Read archived programs, optionally only those that ran successfully."""
+    successful = None
+    if successful_only:
+        index_path = os.path.join(os.path.dirname(programs_dir), "index.json")
+        try:
+            with open(index_path) as f:
+                successful = {e["filename"] for e in json.load(f) if e.get("success")}
+        except (OSError, ValueError, KeyError, TypeError):
+            successful = None
+
+    programs = []
+    for name in sorted(os.listdir(programs_dir)):
+        if not name.endswith(".py"):
+            continue
+        if successful is not None and name not in successful:
+            continue
+        try:
+            with open(os.path.join(programs_dir, name)) as f:
+                code = f.read()
+        except OSError:
+            continue
+        if successful_only and successful is None:
+            # No index to go by: at least make sure it compiles
+            try:
+                compile(code, name, "exec")
+            except (SyntaxError, ValueError):
+                continue
+        programs.append(code)
+    return programs
+
+
+class StubLLMServer:
+    """
+    Threaded HTTP server replaying archived programs as LLM completions.
+
+    Can be run from the command line or started in-process by benchmarks:
+        server = StubLLMServer(tokens_per_sec=0).start()
+        ... point OPENROUTER_ENDPOINT at server.openrouter_endpoint ...
+        server.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 programs_dir: str = DEFAULT_PROGRAMS_DIR,
+                 tokens_per_sec: float = 40.0, latency: float = 0.5,
+                 error_rate: float = 0.0, seed: Optional[int] = None,
+                 successful_only: bool = False):
+        """
+        Args:
+            host, port: Where to listen (port 0 picks a free port)
+            programs_dir: Archived programs to replay
+            tokens_per_sec: Streaming rate; 0 sends as fast as possible
+            latency: Seconds before the first token
+            error_rate: Fraction of requests answered with an error status
+            seed: Seed for program choice, errors and canned replies
+            successful_only: Only replay programs that ran successfully
+        """
+        self.programs = _load_programs(programs_dir, successful_only)
+        if not self.programs:
+            raise ValueError(f"No programs to replay in {programs_dir}")
+        self.tokens_per_sec = tokens_per_sec
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+        # Counters
+        self.requests = 0
+        self.errors = 0
+        self.tokens_sent = 0
+
+        self.httpd = _Server((host, port), _make_handler(self))
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openrouter_endpoint(self) -> str:
+        return f"{self.url}/api/v1"
+
+    def start(self) -> "StubLLMServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # -------------------------------------------------------------------------
+    # Completions
+    # -------------------------------------------------------------------------
+
+    def roll_error(self) -> Optional[int]:
+        """Decide whether this request fails; returns the status to send."""
+        with self._rng_lock:
+            self.requests += 1
+            if self.error_rate > 0 and self._rng.random() < self.error_rate:
+                self.errors += 1
+                return self._rng.choice(ERROR_STATUSES)
+        return None
+
+    def completion(self, prompt: str, max_tokens: int,
+                   stop: Optional[List[str]] = None,
+                   seed: Optional[int] = None) -> List[str]:
+        """Tokens of the reply to prompt, cut at max_tokens / stop strings."""
+        rng = random.Random(seed) if seed is not None else None
+        with self._rng_lock:
+            rng = rng or self._rng
+            # Lessons, titles and BBS posts ask for a sentence; the rest is code
+            if max_tokens < 200 or "Write ONLY the lesson" in prompt:
+                text = rng.choice(PROSE_REPLIES)
+            else:
+                text = "```python\n" + rng.choice(self.programs).rstrip() + "\n```\n"
+
+        for s in stop or []:
+            if s and s in text:
+                text = text[:text.index(s)]
+        return _tokenize(text)[:max(0, max_tokens)]
+
+    def paced(self, tokens: List[str]) -> Iterator[str]:
+        """Yield tokens after the configured latency, at the token rate."""
+        if self.latency > 0:
+            time.sleep(self.latency)
+        interval = 1.0 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+        next_at = time.monotonic()
+        for token in tokens:
+            if interval:
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at += interval
+            self.tokens_sent += 1
+            yield token
+
+
+def _make_handler(server: StubLLMServer):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, chunked streams
+
+        def log_message(self, fmt, *args):
+            pass  # quiet: benchmarks would drown in request logs
+
+        # -- plumbing --------------------------------------------------------
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                return json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return {}
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _start_stream(self, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _end_stream(self):
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        # -- routes ----------------------------------------------------------
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/api/tags":
+                self._send_json(200, {"models": [{"name": STUB_MODEL, "model": STUB_MODEL}]})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            path = self.path.rstrip("/")
+            if path == "/api/v1/chat/completions":
+                self._openrouter(self._read_json())
+            elif path == "/api/generate":
+                self._ollama(self._read_json())
+            else:
+                self._read_json()
+                self._send_json(404, {"error": "not found"})
+
+        def _openrouter(self, req: dict):
+            status = server.roll_error()
+            if status:
+                self._send_json(status, {"error": {"code": status, "message": "stub error"}})
+                return
+
+            messages = req.get("messages") or [{}]
+            prompt = messages[-1].get("content", "")
+            max_tokens = int(req.get("max_tokens") or 1024)
+            tokens = server.completion(prompt, max_tokens, req.get("stop"), req.get("seed"))
+            finish = "length" if len(tokens) >= max_tokens else "stop"
+            model = req.get("model", STUB_MODEL)
+            completion_id = f"gen-{uuid.uuid4().hex[:16]}"
+
+            if not req.get("stream"):
+                self._send_json(200, {
+                    "id": completion_id, "object": "chat.completion", "model": model,
+                    "choices": [{"index": 0, "finish_reason": finish,
+                                 "message": {"role": "assistant",
+                                             "content": "".join(server.paced(tokens))}}],
+                })
+                return
+
+            def event(delta, finish_reason=None):
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                return f"data: {json.dumps(chunk)}\n\n".encode()
+
+            self._start_stream("text/event-stream")
+            try:
+                for token in server.paced(tokens):
+                    self._chunk(event({"content": token}))
+                self._chunk(event({}, finish))
+                self._chunk(b"data: [DONE]\n\n")
+                self._end_stream()
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # client stopped reading
+
+        def _ollama(self, req: dict):
+            status = server.roll_error()
+            if status:
+                self._send_json(status, {"error": "stub error"})
+                return
+
+            options = req.get("options") or {}
+            max_tokens = int(options.get("num_predict") or 1024)
+            tokens = server.completion(req.get("prompt", ""), max_tokens,
+                                       options.get("stop"), options.get("seed"))
+            model = req.get("model", STUB_MODEL)
+            finish = "length" if len(tokens) >= max_tokens else "stop"
+
+            def line(response, done):
+                chunk = {"model": model,
+                         "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                         "response": response, "done": done}
+                if done:
+                    chunk.update({"done_reason": finish, "eval_count": len(tokens)})
+                return chunk
+
+            if req.get("stream") is False:
+                self._send_json(200, line("".join(server.paced(tokens)), True))
+                return
+
+            self._start_stream("application/x-ndjson")
+            try:
+                for token in server.paced(tokens):
+                    self._chunk(json.dumps(line(token, False)).encode() + b"\n")
+                self._chunk(json.dumps(line("", True)).encode() + b"\n")
+                self._end_stream()
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenRouter/Ollama stand-in for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--programs", default=DEFAULT_PROGRAMS_DIR,
+                        help="directory of archived programs to replay")
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0,
+                        help="streaming rate (0 = unthrottled)")
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="seconds before the first token")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests answered with 429/500/529")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for reproducible program choice and errors")
+    parser.add_argument("--successful-only", action="store_true",
+                        help="only replay programs that ran successfully")
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, args.programs, args.tokens_per_sec,
+                           args.latency, args.error_rate, args.seed, args.successful_only)
+    print(f"[Stub] Replaying {len(server.programs)} programs on {server.url}")
+    print(f"[Stub]   OPENROUTER_ENDPOINT={server.openrouter_endpoint}")
+    print(f"[Stub]   OLLAMA_ENDPOINT={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -33,9 +33,8 @@ except ImportError:
 # Hide the Linux console cursor (the blinking rectangle on framebuffer)
 os.system('sudo sh -c \'echo -e "\\033[?25l" > /dev/tty1\' 2>/dev/null')
 
-import datetime
-
 import config
+from simclock import get_clock
 from display.terminal import Terminal
 from display.screensaver import StarryNight
 from llm.generator import LLMGenerator
@@ -126,6 +125,7 @@ def main():
         api_key=api_key,
         model_name=getattr(config, 'LLM_MODEL', '')
     )
+    llm.warm_up()  # open the connection while the rest boots
     
     personality = Personality(
         typing_speed_range=(config.TYPING_SPEED_MIN, config.TYPING_SPEED_MAX),
@@ -197,7 +197,7 @@ def main():
             return False
         if not getattr(config, "SCHEDULE_ENABLED", False):
             return True
-        now = datetime.datetime.now()
+        now = get_clock().now()
         clock_in = getattr(config, "SCHEDULE_CLOCK_IN", 9)
         clock_out = getattr(config, "SCHEDULE_CLOCK_OUT", 23)
         if clock_in <= clock_out:
@@ -6,24 +6,29 @@ THINK → WRITE → RUN → WATCH → ARCHIVE → repeat
 """
 
 import os
-import sys
 import json
-import time
 import random
-import select
-import subprocess
 from datetime import datetime
 from enum import Enum, auto
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from display.terminal import Terminal
+from display.canvas_protocol import SharedPixelBuffer
+from display.frame_stream import client_count
 from llm.generator import LLMGenerator
 from programmer.personality import Personality
 from programmer import creativity
 from programmer.liked_store import LikedStore
+from programmer.program_output import ProgramOutput
+from programmer.prefetch import ProgramPrefetcher, ProgramPlan
+from programmer.runner import ProgramRunner
+from programmer.sandbox import Watchdog
+from programmer.preflight import run_preflight
+from programmer.validator import Diagnostic, validate
 from archive.repository import Repository
 from archive.learning import LearningSystem
+from simclock import get_clock
 import config
 
 
@@ -51,6 +56,7 @@ class Program:
     timestamp: float
     success: bool = False
     error_message: Optional[str] = None
+    kill_reason: Optional[str] = None  # resource limit that stopped it
 
 
 class Brain:
@@ -64,7 +70,7 @@ class Brain:
     
     def __init__(self, terminal: Terminal, llm: LLMGenerator,
                  personality: Personality, archive: Repository,
-                 bbs_client=None):
+                 bbs_client=None, clock=None):
         """
         Initialize brain.
 
@@ -74,12 +80,14 @@ class Brain:
             personality: Personality controller
             archive: Program storage
             bbs_client: Optional BBSClient for social BBS breaks
+            clock: Time source for all pacing (defaults to simclock.get_clock())
         """
         self.terminal = terminal
         self.llm = llm
         self.personality = personality
         self.archive = archive
         self.bbs_client = bbs_client
+        self.clock = clock or get_clock()
         self.learning = LearningSystem()
         
         self.state = State.BOOT
@@ -96,19 +104,29 @@ class Brain:
         self._last_program_type = None
         self._session_history = []  # resets each restart
         self.current_process = None
+        self._draw_fd = None  # read end of the binary canvas pipe
+        self._program_output = None
+        self._pixel_buffer = None  # shared RGB framebuffer for the canvas
         self._force_screensaver = False
         self.liked_store = LikedStore()
+        # Next program generated during WATCH (see programmer/prefetch.py)
+        self.prefetcher = ProgramPrefetcher(llm)
+        self._prefetched = False  # current program came from the prefetcher
+        self._diagnostics = []  # validator findings for the current code, for FIX
+        # Forks programs from a pre-imported interpreter (see programmer/runner.py)
+        self.runner = ProgramRunner()
+        self.runner.start()
 
     def request_restart(self):
         """Request a restart - skip to next program cycle."""
         self._restart_requested = True
+        self.prefetcher.cancel("restart requested")
         print("[Brain] Restart requested via web UI")
 
     def get_status(self) -> dict:
         """Get current status for web UI."""
         stats = self.archive.get_stats()
-        import datetime
-        now = datetime.datetime.now()
+        now = self.clock.now()
         hour = now.hour
 
         status = {
@@ -133,6 +151,7 @@ class Brain:
             "system_time": now.strftime("%H:%M"),
             "force_screensaver": self._force_screensaver,
             "stream_enabled": getattr(config, "WEB_STREAM_ENABLED", False),
+            "stream_clients": client_count(),
             # Creative dimensions for the current cycle
             "creative_style": (self._current_creative or {}).get("style"),
             "creative_palette": (self._current_creative or {}).get("palette"),
@@ -141,6 +160,11 @@ class Brain:
             "is_variation": getattr(self, "_current_variation", None) is not None,
             "liked_count": self.liked_store.count(),
             "session_history": list(reversed(self._session_history)),
+            # Canvas ingestion metrics for the current/last program run
+            "canvas_ingest": self._program_output.stats() if self._program_output else None,
+            "canvas_frames": self.terminal.canvas_stats(),
+            "display_frames": self.terminal.display_stats(),
+            "prefetch": self.prefetcher.stats(),
         }
         return status
 
@@ -165,6 +189,7 @@ class Brain:
         while True:
             if should_continue and not should_continue():
                 print("[Brain] Clock out time. Stopping.")
+                self.prefetcher.cancel("clocked out")
                 return
 
             try:
@@ -208,7 +233,7 @@ class Brain:
         """Transition to a new state with delay."""
         print(f"[Brain] {self.state.name} → {new_state.name}")
         self._update_sidebar()
-        time.sleep(config.STATE_TRANSITION_DELAY)
+        self.clock.sleep(config.STATE_TRANSITION_DELAY)
         self.state = new_state
     
     def _do_boot(self):
@@ -218,11 +243,11 @@ class Brain:
         self.terminal.clear()
         self.terminal.set_status("BOOTING")
         self.terminal.type_string("Tiny Programmer v0.1\n")
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         self.terminal.type_string("Initializing brain...\n")
-        time.sleep(1.0)
+        self.clock.sleep(1.0)
         self.terminal.type_string("Ready.\n")
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         self._transition(State.THINK)
     
     def _do_think(self):
@@ -240,25 +265,64 @@ class Brain:
             except Exception:
                 pass
 
-        # Select model for this new program (picks random if in surprise mode)
-        self.llm.select_for_new_program()
+        mood = self.personality.get_mood_status()
+
+        # Use the program generated during the last WATCH if it's still valid;
+        # otherwise plan now (picks a random model if in surprise mode)
+        self._refresh_prefetch()
+        plan = self.prefetcher.take()
+        self._prefetched = plan is not None
+        if plan:
+            print(f"[Brain] Using prefetched program: {plan.program_type} ({plan.mode})")
+        else:
+            plan = self._plan_program(mood)
+        self.llm.select_for_new_program(plan.model, plan.seed)
         self.terminal.set_model_name(self.llm.get_short_name())
 
-        # Prepare mood and creative dimensions for this cycle
-        mood = self.personality.get_mood_status()
+        program_type = plan.program_type
+        self._last_program_type = program_type
+        self._current_creative = plan.creative
+        self._current_variation = plan.variation
+        self._current_mode = plan.mode
+        self._current_prompt = plan.prompt
+
+        # Thinking comments
+        comment = self.personality.get_thinking_comment()
+        self.terminal.type_string(f"\n{comment}\n")
+
+        # Simulate thinking time
+        self.clock.sleep(random.uniform(2.0, 4.0))
+
+        # Initialize current program container
+        self.current_program = Program(
+            code="",
+            program_type=program_type,
+            thought_process=comment,
+            timestamp=self.clock.time()
+        )
+        
+        self._transition(State.WRITE)
+
+    def _plan_program(self, mood: str) -> ProgramPlan:
+        """
+        Decide the next program: model, seed, mode, type and prompt.
+
+        Used by THINK, and during WATCH to generate the next program ahead
+        of time. Has no side effects: THINK records the plan it uses.
+        """
+        model, seed = self.llm.pick_next()
 
         # Three-way split: variation > core > creative
         variation_prob = getattr(config, "VARIATION_PROBABILITY", 0.15)
         core_prob = getattr(config, "CORE_PROMPT_PROBABILITY", 0.5)
         roll = random.random()
         liked = self.liked_store.pick() if roll < variation_prob and self.liked_store.count() > 0 else None
+        creative = None
 
         if liked:
             # Variation mode: remix a liked program
             program_type = liked["type"]
-            self._current_creative = None
-            self._current_variation = liked
-            self._current_mode = "variation"
+            mode = "variation"
             print(f"[Brain] Variation: remixing liked {program_type}")
         elif roll < variation_prob + core_prob:
             # Core mode: pick from core list (built-ins + user-opted customs),
@@ -274,45 +338,72 @@ class Brain:
             last = getattr(self, "_last_program_type", None)
             choices = [p for p in core_programs if p != last] or core_programs
             program_type = random.choice(choices)
-            self._last_program_type = program_type
-            self._current_creative = None
-            self._current_variation = None
-            self._current_mode = "core"
+            mode = "core"
             print(f"[Brain] Core: {program_type}")
         else:
             # Creative mode: full creativity system
             creative = creativity.pick_creative_dimensions(mood)
-            self._current_creative = creative
-            self._current_variation = None
-            self._current_mode = "creative"
+            mode = "creative"
             program_type = self._choose_program_type(mood)
             seed_str = creative.get("inspiration_seed") or "none"
             print(f"[Brain] Creative: style={creative['style']}, palette={creative['palette']}, seed={seed_str}")
 
-        # Thinking comments
-        comment = self.personality.get_thinking_comment()
-        self.terminal.type_string(f"\n{comment}\n")
-
-        # Simulate thinking time
-        time.sleep(random.uniform(2.0, 4.0))
-
-        # Prepare prompt
-        lessons = self.learning.get_recent_lessons()
-        if liked:
-            self._current_prompt = self.llm.build_variation_prompt(liked["code"], program_type)
-        else:
-            self._current_prompt = self.llm.build_prompt(program_type, mood, lessons,
-                                                         self._current_creative)
-        
-        # Initialize current program container
-        self.current_program = Program(
-            code="",
+        return ProgramPlan(
             program_type=program_type,
-            thought_process=comment,
-            timestamp=time.time()
+            mode=mode,
+            prompt=self._build_plan_prompt(program_type, mood, creative, liked, model),
+            model=model,
+            seed=seed,
+            model_setting=self.llm.model_setting,
+            creative=creative,
+            variation=liked,
+            mood=mood,
         )
-        
-        self._transition(State.WRITE)
+
+    def _build_plan_prompt(self, program_type: str, mood: str, creative: Optional[dict],
+                           liked: Optional[dict], model: str) -> str:
+        """The prompt for a plan, with the lessons learned so far."""
+        if liked:
+            return self.llm.build_variation_prompt(liked["code"], program_type)
+        lessons = self.learning.get_recent_lessons()
+        return self.llm.build_prompt(program_type, mood, lessons, creative, model=model)
+
+    def _refresh_prefetch(self):
+        """
+        Bring the prefetched program up to date with what happened since it
+        was planned (during WATCH): the lesson from REFLECT, the mood after
+        ARCHIVE.
+
+        If the prompt comes out the same the code is kept; otherwise it is
+        generated again from the new prompt. Creative plans were picked for
+        a mood, so a mood change drops them.
+        """
+        plan = self.prefetcher.plan
+        if plan is None:
+            return
+        mood = self.personality.get_mood_status()
+        if plan.mode == "creative" and plan.mood != mood:
+            self.prefetcher.cancel("mood changed")
+            return
+        try:
+            prompt = self._build_plan_prompt(plan.program_type, mood, plan.creative,
+                                             plan.variation, plan.model)
+        except Exception as e:
+            print(f"[Brain] Prefetch refresh failed: {e}")
+            self.prefetcher.cancel("refresh failed")
+            return
+        if prompt != plan.prompt:
+            print("[Brain] Lessons changed since the prefetch was planned, regenerating")
+            self.prefetcher.start(replace(plan, prompt=prompt, mood=mood))
+
+    def _start_prefetch(self):
+        """Plan the next program and start generating it in the background."""
+        if not getattr(config, "SPECULATIVE_PREFETCH", True) or self.prefetcher.active:
+            return
+        try:
+            self.prefetcher.start(self._plan_program(self.personality.get_mood_status()))
+        except Exception as e:
+            print(f"[Brain] Prefetch failed to start: {e}")
     
     def _choose_program_type(self, mood: str = None) -> str:
         """Choose what type of program to write, biased by mood, avoiding repeats."""
@@ -322,7 +413,6 @@ class Brain:
             list(config.PROGRAM_TYPES),
             last_type=last,
         )
-        self._last_program_type = choice
         return choice
     
     def _do_write(self):
@@ -355,11 +445,16 @@ class Brain:
             "",  # Empty lines at start
         ]
 
-        # Stream from LLM - filter duplicate header lines
+        # Stream from LLM (or the prefetch buffer) - filter duplicate header lines
+        if self._prefetched:
+            tokens = self.prefetcher.tokens()
+            self._prefetched = False
+        else:
+            tokens = self.llm.stream(self._current_prompt, max_tokens=config.LLM_MAX_TOKENS,
+                                     temperature=config.LLM_TEMPERATURE,
+                                     stop=["if __name__", "<|im_end|>"])
         try:
-            for token in self.llm.stream(self._current_prompt, max_tokens=config.LLM_MAX_TOKENS,
-                                            temperature=config.LLM_TEMPERATURE,
-                                            stop=["if __name__", "<|im_end|>"]):
+            for token in tokens:
                 # Basic markdown filtering
                 if "```" in token:
                     if not in_code_block:
@@ -375,6 +470,8 @@ class Brain:
                     continue
 
                 if self._restart_requested or self._force_screensaver:
+                    self.prefetcher.cancel("restart requested" if self._restart_requested
+                                           else "screensaver")
                     break
 
                 for char in token:
@@ -390,7 +487,7 @@ class Brain:
                             for c in current_line:
                                 self.terminal.type_char(c)
                                 full_code += c
-                                time.sleep(random.uniform(0.02, 0.08))
+                                self.clock.sleep(random.uniform(0.02, 0.08))
                                 self.terminal.tick()
                         else:
                             print(f"[Brain] Skipping duplicate: {line_stripped}")
@@ -416,7 +513,7 @@ class Brain:
 
         self.current_program.code = full_code
         self.terminal.type_string("\n\n// finished.\n")
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         self._transition(State.REVIEW)
     
     def _do_review(self):
@@ -425,7 +522,7 @@ class Brain:
         """
         self.terminal.set_status("REVIEWING", "careful")
         self.terminal.type_string("\n// checking my work...\n")
-        time.sleep(1)
+        self.clock.sleep(1)
         
         # Clean the code (same as in _do_run)
         raw_code = self.current_program.code
@@ -438,37 +535,72 @@ class Brain:
             clean_lines.append(line)
         code = '\n'.join(clean_lines).strip()
         
-        # 1. Check for banned imports
-        banned = ["pygame", "turtle", "tkinter", "matplotlib"]
-        for lib in banned:
-            if f"import {lib}" in code or f"from {lib}" in code:
-                msg = f"Forbidden library usage: {lib}"
-                self.terminal.type_string(f"// oops, I used {lib}!\n")
-                if self.fix_attempts < 2:
-                    self.current_program.error_message = msg
-                    self._transition(State.FIX)
-                    return
-                else:
-                    self.terminal.type_string("// ignoring it...\n")
-
-        # 2. Check syntax
-        try:
-            compile(code, "<string>", "exec")
-        except SyntaxError as e:
-            msg = f"SyntaxError: {e.msg} at line {e.lineno}"
-            self.terminal.type_string(f"// syntax error found!\n")
+        # 1. Static checks: syntax, imports, canvas calls, frame loops
+        result = validate(code)
+        self._diagnostics = list(result.diagnostics)  # result is cached; we add to it
+        errors = result.errors
+        print(f"[Brain] Review: {len(errors)} errors, {len(result.warnings)} warnings, "
+              f"~{result.draw_calls_per_frame or 0} draw calls/frame")
+        for diagnostic in result.diagnostics:
+            print(f"[Brain]   {diagnostic.severity}: {diagnostic}")
+        if errors:
+            first = errors[0]
+            if first.kind == "syntax":
+                self.terminal.type_string("// syntax error found!\n")
+            else:
+                self.terminal.type_string(f"// oops, line {first.line} is wrong!\n")
             if self.fix_attempts < 2:
-                self.current_program.error_message = msg
+                self.current_program.error_message = first.message
                 self._transition(State.FIX)
                 return
-            else:
+            if first.kind == "syntax":
                 self.terminal.type_string("// still broken, giving up.\n")
                 self.current_program.success = False
                 self._transition(State.ARCHIVE)
                 return
-            
+            self.terminal.type_string("// ignoring it...\n")
+
+        # 2. Dry run: a few frames headless, so crashes never reach the screen
+        frames = getattr(config, "PREFLIGHT_FRAMES", 0)
+        result = None
+        if frames > 0:
+            try:
+                result = run_preflight(self.runner, code, self._program_env(), frames,
+                                       getattr(config, "PREFLIGHT_TIMEOUT", 3.0),
+                                       tick=self.terminal.tick)
+            except Exception as e:
+                print(f"[Brain] Preflight unavailable: {e}")
+        if result is not None:
+            print(f"[Brain] Preflight: {result.frames} frames, {result.commands} draw commands, "
+                  f"{result.elapsed_ms:.0f}ms{' (timed out)' if result.timed_out else ''}"
+                  f"{'' if result.ok else ' - crashed'}")
+            for warning in result.warnings:
+                print(f"[Brain] Preflight warning: {warning}")
+                self._diagnostics.append(Diagnostic(0, "warning", "preflight", warning))
+            # Bad colours are silently not drawn: worth a fix like a crash
+            lost = result.dropped
+            if not getattr(config, "CANVAS_BINARY_PROTOCOL", True):
+                lost += result.coerced
+            if result.ok and lost and self.fix_attempts < 2:
+                self.terminal.type_string("// some colours are wrong!\n")
+                self.current_program.error_message = (
+                    f"{lost} draw calls in the first {result.frames} frames are not drawn "
+                    f"because their colour is not three 0-255 ints")
+                self._transition(State.FIX)
+                return
+            if not result.ok:
+                self.terminal.type_string("// it crashes when I try it!\n")
+                self.current_program.error_message = result.error
+                if self.fix_attempts < 2:
+                    self._transition(State.FIX)
+                else:
+                    self.terminal.type_string("// still broken, giving up.\n")
+                    self.current_program.success = False
+                    self._transition(State.ARCHIVE)
+                return
+
         self.terminal.type_string("// looks good!\n")
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         self._transition(State.RUN)
     
     def _do_run(self):
@@ -479,6 +611,7 @@ class Brain:
         """
         self.terminal.set_status("RUNNING")
         self.terminal.show_canvas()
+        self.current_program.kill_reason = None
 
         # Clean the code
         code = self.current_program.code
@@ -491,47 +624,79 @@ class Brain:
                 continue
             clean_lines.append(line)
         code = '\n'.join(clean_lines).strip()
-        
-        # Save cleaned code to temp file for execution
-        filename = "temp_execution.py"
-        programs_dir = "programs"
-        if not os.path.exists(programs_dir):
-            os.makedirs(programs_dir)
-            
-        filepath = os.path.join(programs_dir, filename)
-        with open(filepath, 'w') as f:
-            f.write(code)
-            
+
+        draw_w = None
         try:
-            # Minimal environment for the subprocess — only what generated
-            # programs need. Avoids leaking API keys and other secrets.
-            env = {
-                "PATH": os.environ.get("PATH", ""),
-                "HOME": os.environ.get("HOME", ""),
-                "PYTHONPATH": os.environ.get("PYTHONPATH", ""),
-                "TINY_CANVAS_W": str(config.CANVAS_DRAW_W),
-                "TINY_CANVAS_H": str(config.CANVAS_DRAW_H),
-            }
-
-            # Run with python -u (unbuffered) so we can see output immediately
-            self.current_process = subprocess.Popen(
-                [sys.executable, "-u", filepath],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1,  # Line buffered
-                env=env,
-            )
+            env = self._program_env()
+
+            # Offer the binary draw pipe; tiny_canvas uses it if present
+            pass_fds = ()
+            fd_env = {}
+            if getattr(config, "CANVAS_BINARY_PROTOCOL", True):
+                self._draw_fd, draw_w = os.pipe()
+                env["TINY_CANVAS_FD"] = str(draw_w)
+                fd_env["TINY_CANVAS_FD"] = draw_w
+                pass_fds = (draw_w,)
+
+            # Shared pixel buffer for programs that opt in via c.pixel_buffer()
+            if getattr(config, "CANVAS_SHARED_PIXELS", True):
+                self._pixel_buffer = SharedPixelBuffer(
+                    config.CANVAS_DRAW_W, config.CANVAS_DRAW_H)
+                self.terminal.attach_pixel_buffer(
+                    [self._pixel_buffer.frame(i) for i in range(SharedPixelBuffer.FRAMES)],
+                    config.CANVAS_DRAW_W, config.CANVAS_DRAW_H, self._pixel_buffer.header())
+                env["TINY_CANVAS_SHM_FD"] = str(self._pixel_buffer.fd)
+                fd_env["TINY_CANVAS_SHM_FD"] = self._pixel_buffer.fd
+                pass_fds += (self._pixel_buffer.fd,)
+
+            # Unbuffered stdout+stderr on one pipe, so we see output immediately
+            # The code is handed over in memory; nothing is written to disk
+            self.current_process = self.runner.run(code, env, pass_fds, fd_env)
             
             self.current_program.success = True
             self._transition(State.WATCH)
             
         except Exception as e:
+            self._close_draw_pipe()
+            self.terminal.hide_canvas()
+            self._close_pixel_buffer()
             self.terminal.type_string(f"Error starting program: {e}\n")
             self.current_program.success = False
             self.current_program.error_message = str(e)
             self._transition(State.ERROR)
-    
+        finally:
+            # The child holds its own copy of the write end
+            if draw_w is not None:
+                os.close(draw_w)
+
+    def _program_env(self) -> dict:
+        """
+        Minimal environment for generated programs — only what they need.
+        Avoids leaking API keys and other secrets.
+        """
+        return {
+            "PATH": os.environ.get("PATH", ""),
+            "HOME": os.environ.get("HOME", ""),
+            "PYTHONPATH": os.environ.get("PYTHONPATH", ""),
+            "TINY_CANVAS_W": str(config.CANVAS_DRAW_W),
+            "TINY_CANVAS_H": str(config.CANVAS_DRAW_H),
+        }
+
+    def _close_draw_pipe(self):
+        """Close the read end of the binary canvas pipe, if open."""
+        if self._draw_fd is not None:
+            try:
+                os.close(self._draw_fd)
+            except OSError:
+                pass
+            self._draw_fd = None
+
+    def _close_pixel_buffer(self):
+        """Release the shared pixel buffer (after the canvas let go of it)."""
+        if self._pixel_buffer is not None:
+            self._pixel_buffer.close()
+            self._pixel_buffer = None
+
     def _do_watch(self):
         """
         Watch state.
@@ -540,15 +705,25 @@ class Brain:
         """
         self.terminal.set_status("WATCHING", "proud")
 
-        start_time = time.time()
+        start_time = self.clock.time()
         duration = random.randint(config.WATCH_DURATION_MIN, config.WATCH_DURATION_MAX)
         print(f"[Brain] Watch duration: {duration}s (range: {config.WATCH_DURATION_MIN}-{config.WATCH_DURATION_MAX})")
 
-        last_output = ""
-        
-        while time.time() - start_time < duration:
+        # The reader takes ownership of the draw pipe
+        output = ProgramOutput(self.current_process.stdout.fileno(), self._draw_fd,
+                               rate_limit=getattr(config, "PROGRAM_OUTPUT_RATE", 0))
+        self._draw_fd = None
+        self._program_output = output
+        watchdog = Watchdog(self.current_process.pid, self.runner.limits)
+
+        # Generate the next program while this one runs
+        self._start_prefetch()
+
+        while self.clock.time() - start_time < duration:
             # Check for restart or screensaver request
             if self._restart_requested or self._force_screensaver:
+                self.prefetcher.cancel("restart requested" if self._restart_requested
+                                       else "screensaver")
                 if self._restart_requested:
                     self._restart_requested = False
                     self.terminal.type_string("\n// Restart requested!\n")
@@ -556,31 +731,43 @@ class Brain:
                     self.current_process.terminate()
                 break
 
+            # Drain everything the program produced since the last frame,
+            # so the canvas keeps pace no matter how much it draws per frame
+            try:
+                records, lines = output.drain()
+                if records:
+                    self.terminal.process_draw_records(records)
+                for line in lines:
+                    self.terminal.type_string(line)
+            except Exception:
+                pass
+
             # Check if process finished
             if self.current_process.poll() is not None:
                 self.terminal.type_string("\n// Program finished early.\n")
                 break
 
-            # Non-blocking read so timeout always works
-            try:
-                ready, _, _ = select.select(
-                    [self.current_process.stdout], [], [], 0.1)
-                if ready:
-                    line = self.current_process.stdout.readline()
-                    if line:
-                        if line.startswith("CMD:"):
-                            self.terminal.process_draw_command(line)
-                        else:
-                            self.terminal.type_string(line)
-                        last_output = line
-            except Exception:
-                pass
+            # Kill it if it outgrew its limits
+            reason = watchdog.check()
+            if reason:
+                print(f"[Brain] Killing program: {reason}")
+                self.terminal.type_string(f"\n// Killed: {reason}\n")
+                self.current_process.kill()
+                self.current_process.wait(timeout=1.0)
+                break
 
             # Flush display to show drawing updates
             self.terminal.tick()
         
         # Hide canvas popup
+        frames = self.terminal.canvas_stats()
         self.terminal.hide_canvas()
+        self._close_pixel_buffer()
+        output.close_draw()
+        stats = output.stats()
+        print(f"[Brain] Canvas ingest: {stats['records_total']} records "
+              f"({stats['records_per_sec']}/s), max backlog {stats['max_backlog_bytes']}B, "
+              f"{frames['frames_presented']} frames shown, {frames['frames_skipped']} skipped")
 
         # Cleanup process
         exit_code = self.current_process.poll()
@@ -596,8 +783,12 @@ class Brain:
             # Process exited early, check if error
             if exit_code != 0:
                 # Try to read remaining stderr/stdout
-                remaining = self.current_process.stdout.read()
-                error_msg = (last_output + "\n" + remaining).strip()
+                output.read_remaining()
+                error_msg = "".join(output.tail).strip()
+                reason = watchdog.explain(exit_code, error_msg)
+                if reason:
+                    self.current_program.kill_reason = reason
+                    error_msg = f"{error_msg}\n\nProgram was stopped ({reason})".strip()
                 if not error_msg:
                     error_msg = f"Process exited with code {exit_code}"
                 
@@ -617,11 +808,12 @@ class Brain:
         self.fix_attempts += 1
         self.terminal.set_status("FIXING", "worried")
         self.terminal.type_string(f"\n// oh no, it broke :(\n")
-        time.sleep(1)
+        self.clock.sleep(1)
         self.terminal.type_string(f"// trying to fix it (attempt {self.fix_attempts})...\n")
-        time.sleep(1)
+        self.clock.sleep(1)
         
-        prompt = self.llm.build_fix_prompt(self.current_program.code, self.current_program.error_message)
+        prompt = self.llm.build_fix_prompt(self.current_program.code, self.current_program.error_message,
+                                           self._diagnostics)
         
         full_code = ""
         in_code_block = False
@@ -649,7 +841,7 @@ class Brain:
                 for char in token:
                     self.terminal.type_char(char)
                     full_code += char
-                    time.sleep(random.uniform(0.01, 0.05))
+                    self.clock.sleep(random.uniform(0.01, 0.05))
                     self.terminal.tick()
 
         except Exception as e:
@@ -659,14 +851,14 @@ class Brain:
 
         self.current_program.code = full_code
         self.terminal.type_string("\n\n// fixed?\n")
-        time.sleep(1)
+        self.clock.sleep(1)
         self._transition(State.REVIEW)
     
     def _do_reflect(self):
         """Reflect on what happened and learn a lesson."""
         self.terminal.set_status("REFLECTING", "wise")
         self.terminal.type_string("\n// what did I learn?\n")
-        time.sleep(1)
+        self.clock.sleep(1)
         
         # Determine result string
         if self.current_program.success:
@@ -686,7 +878,7 @@ class Brain:
                 token = token.replace("\n", " ")
                 self.terminal.type_char(token)
                 lesson += token
-                time.sleep(random.uniform(0.01, 0.05))
+                self.clock.sleep(random.uniform(0.01, 0.05))
                 self.terminal.tick()
         except Exception:
             pass
@@ -694,8 +886,10 @@ class Brain:
         if lesson:
             self.learning.add_lesson(lesson)
             self.terminal.type_string("\n// saved to memory.\n")
+            # Regenerate the next program with this lesson while we rest
+            self._refresh_prefetch()
         
-        time.sleep(2)
+        self.clock.sleep(2)
 
         # BBS break chance after reflecting
         if config.BBS_ENABLED and self.bbs_client:
@@ -726,7 +920,8 @@ class Brain:
                 mood=self.personality.get_mood_status(),
                 success=self.current_program.success,
                 thought_process=self.current_program.thought_process,
-                error_message=self.current_program.error_message
+                error_message=self.current_program.error_message,
+                kill_reason=self.current_program.kill_reason,
             )
             self.terminal.type_string(f"\n// Saved to archive.\n")
         except Exception as e:
@@ -735,16 +930,15 @@ class Brain:
         self.personality.update_mood(self.current_program.success)
         self.programs_written += 1
 
-        import datetime
         self._session_history.append({
             "type": self.current_program.program_type,
             "mode": self._current_mode or "?",
             "success": self.current_program.success,
-            "time": datetime.datetime.now().strftime("%H:%M"),
+            "time": self.clock.now().strftime("%H:%M"),
             "model": self.llm.get_short_name(),
         })
         
-        time.sleep(1)
+        self.clock.sleep(1)
         self._transition(State.REFLECT)
     
     def _do_error(self):
@@ -755,7 +949,7 @@ class Brain:
         """
         self.terminal.set_status("ERROR", "confused")
         self.terminal.type_string("// something went wrong...\n")
-        time.sleep(2)
+        self.clock.sleep(2)
         self.personality.update_mood(False)
         self._transition(State.THINK)
 
@@ -779,7 +973,7 @@ class Brain:
             self.terminal.set_status("BBS BREAK", self.personality.get_mood_status())
 
             # Post lurk report (max once per hour)
-            if time.time() - self._last_lurk_time > 3600:
+            if self.clock.time() - self._last_lurk_time > 3600:
                 last_type = getattr(self.current_program, "program_type", "something") if self.current_program else "something"
                 version = getattr(config, "VERSION", "?")
                 self.bbs_client.post(
@@ -787,12 +981,12 @@ class Brain:
                     board="lurk_report",
                     include_version=True,
                 )
-                self._last_lurk_time = time.time()
+                self._last_lurk_time = self.clock.time()
 
             # Show main menu with board stats
             stats = self.bbs_client.get_board_stats()
             self.terminal.render_bbs_menu(stats, self.bbs_client.device_name)
-            time.sleep(random.uniform(2.0, 4.0))
+            self.clock.sleep(random.uniform(2.0, 4.0))
 
             # Browse 2-3 random boards (always, before any posting)
             self._bbs_browse()
@@ -809,7 +1003,7 @@ class Brain:
         except Exception as e:
             print(f"[BBS] Break failed: {e}")
         finally:
-            time.sleep(1)
+            self.clock.sleep(1)
             try:
                 self.terminal.exit_bbs_mode()
             except Exception:
@@ -826,17 +1020,17 @@ class Brain:
             if board == "code_share":
                 threads = self.bbs_client.get_thread_list(limit=5)
                 self.terminal.render_bbs_thread_list(threads)
-                time.sleep(random.uniform(4, 8))
+                self.clock.sleep(random.uniform(4, 8))
                 # Pick a random thread and read it
                 if threads:
                     thread = random.choice(threads)
                     detail = self.bbs_client.get_thread_detail(thread["id"])
                     self.terminal.render_bbs_thread_detail(detail)
-                    time.sleep(random.uniform(10, 20))
+                    self.clock.sleep(random.uniform(10, 20))
             else:
                 feed = self.bbs_client.get_flat_feed(board, limit=10)
                 self.terminal.render_bbs_feed(board, feed)
-                time.sleep(random.uniform(8, 15))
+                self.clock.sleep(random.uniform(8, 15))
 
     def _pick_bbs_board(self) -> str:
         """Pick a board to post on based on mood, with weighted selection."""
@@ -879,7 +1073,7 @@ class Brain:
         self.terminal.render_bbs_compose(title)
         for char in self.current_program.code[:3000]:
             self.terminal.type_bbs_char(char)
-            time.sleep(random.uniform(0.01, 0.04))
+            self.clock.sleep(random.uniform(0.01, 0.04))
             self.terminal.tick()
 
         self.bbs_client.post(
@@ -896,7 +1090,7 @@ class Brain:
         """Browse Code Share threads and optionally reply."""
         threads = self.bbs_client.get_thread_list(limit=10)
         self.terminal.render_bbs_thread_list(threads)
-        time.sleep(random.uniform(3, 6))
+        self.clock.sleep(random.uniform(3, 6))
 
         if not threads:
             return
@@ -904,7 +1098,7 @@ class Brain:
         thread = random.choice(threads[:5])
         detail = self.bbs_client.get_thread_detail(thread["id"])
         self.terminal.render_bbs_thread_detail(detail)
-        time.sleep(random.uniform(8, 20))
+        self.clock.sleep(random.uniform(8, 20))
 
         mood = self.personality.get_mood_status()
         if mood != "tired" and random.random() < 0.5:
@@ -934,7 +1128,7 @@ class Brain:
             reply += token
             for char in token:
                 self.terminal.type_bbs_char(char)
-                time.sleep(random.uniform(0.02, 0.06))
+                self.clock.sleep(random.uniform(0.02, 0.06))
                 self.terminal.tick()
 
         reply = reply.strip()[:500]
@@ -949,7 +1143,7 @@ class Brain:
         """Visit a flat board (chat, news, science_tech, jokes)."""
         feed = self.bbs_client.get_flat_feed(board, limit=15)
         self.terminal.render_bbs_feed(board, feed)
-        time.sleep(random.uniform(10, 30))
+        self.clock.sleep(random.uniform(10, 30))
 
         mood = self.personality.get_mood_status()
         if mood != "tired" and random.random() < 0.4:
@@ -997,7 +1191,7 @@ class Brain:
             post_content += token
             for char in token:
                 self.terminal.type_bbs_char(char)
-                time.sleep(random.uniform(0.02, 0.06))
+                self.clock.sleep(random.uniform(0.02, 0.06))
                 self.terminal.tick()
 
         post_content = post_content.strip()[:500]
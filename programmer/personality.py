@@ -13,6 +13,8 @@ from enum import Enum
 from typing import Tuple, Optional
 from dataclasses import dataclass
 
+from simclock import get_clock
+
 
 class Mood(Enum):
     """Possible moods for Tiny Programmer."""
@@ -47,7 +49,8 @@ class Personality:
     """
     
     def __init__(self, typing_speed_range: Tuple[float, float],
-                 typo_probability: float, pause_probability: float):
+                 typo_probability: float, pause_probability: float,
+                 clock=None):
         """
         Initialize personality.
         
@@ -55,17 +58,18 @@ class Personality:
             typing_speed_range: (min, max) characters per second
             typo_probability: Chance of making a typo (0.0 - 1.0)
             pause_probability: Chance of pausing mid-line (0.0 - 1.0)
+            clock: Time source for time-of-day moods (defaults to simclock.get_clock())
         """
         self.speed_min, self.speed_max = typing_speed_range
         self.typo_probability = typo_probability
         self.pause_probability = pause_probability
+        self.clock = clock or get_clock()
         
         self.consecutive_failures = 0
         self.consecutive_successes = 0
 
         # Set initial mood based on time of day
-        import datetime
-        hour = datetime.datetime.now().hour
+        hour = self.clock.now().hour
         if hour >= 23 or hour < 5:
             self.mood = Mood.TIRED
         else:
@@ -85,8 +89,7 @@ class Personality:
             self.consecutive_failures += 1
             self.consecutive_successes = 0
 
-        import datetime
-        hour = datetime.datetime.now().hour
+        hour = self.clock.now().hour
 
         # Late night → TIRED
         if hour >= 23 or hour < 5:
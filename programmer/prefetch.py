@@ -0,0 +1,178 @@
+"""
+Speculative Program Prefetch
+
+While a program runs (WATCH), the next one is already planned and its
+code streamed from the LLM into a buffer. The following WRITE then types
+from that buffer instead of waiting for the first token.
+
+A prefetch is tied to the model setting it was planned under: switching
+models in the web UI discards it. Restart and screensaver requests cancel
+it, and the Brain plans from scratch as before. The plan is made before
+the running program is archived and reflected on, so the Brain rebuilds
+its prompt afterwards and regenerates if the lessons or mood changed it.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+import config
+
+
+@dataclass
+class ProgramPlan:
+    """Everything THINK decides about the next program."""
+    program_type: str
+    mode: str  # "variation", "core", or "creative"
+    prompt: str
+    model: str
+    seed: int
+    model_setting: str  # llm.model_setting when planned
+    creative: Optional[dict] = None
+    variation: Optional[dict] = None  # liked program being remixed
+    mood: str = ""  # mood the plan was made in
+
+
+@dataclass
+class _Prefetch:
+    plan: ProgramPlan
+    tokens: List[str] = field(default_factory=list)
+    done: bool = False
+    error: Optional[Exception] = None
+    taken: bool = False  # handed to WRITE
+
+
+class ProgramPrefetcher:
+    """
+    Streams one planned program in the background.
+
+    start() kicks off generation, take() hands the result to WRITE as a
+    token iterator that replays the buffer and then follows the stream
+    if it is still running.
+    """
+
+    def __init__(self, llm):
+        self.llm = llm
+        self._cond = threading.Condition()
+        self._current: Optional[_Prefetch] = None
+        self._cancel = threading.Event()
+
+        # Metrics
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+
+    @property
+    def active(self) -> bool:
+        """A prefetch is running or waiting to be used."""
+        current = self._current
+        return current is not None and not current.taken
+
+    @property
+    def plan(self) -> Optional[ProgramPlan]:
+        """Plan of the prefetch waiting to be used, if any."""
+        current = self._current
+        return current.plan if current is not None and not current.taken else None
+
+    def start(self, plan: ProgramPlan):
+        """Start generating plan's code, replacing any earlier prefetch."""
+        self.cancel()
+        prefetch = _Prefetch(plan)
+        cancel = threading.Event()
+        with self._cond:
+            self._current = prefetch
+            self._cancel = cancel
+        self.started += 1
+        print(f"[Prefetch] Generating next program: {plan.program_type} ({plan.model})")
+        threading.Thread(target=self._run, args=(prefetch, cancel),
+                         name="prefetch", daemon=True).start()
+
+    def _run(self, prefetch: _Prefetch, cancel: threading.Event):
+        plan = prefetch.plan
+        try:
+            for token in self.llm.stream(plan.prompt, max_tokens=config.LLM_MAX_TOKENS,
+                                         temperature=config.LLM_TEMPERATURE,
+                                         stop=["if __name__", "<|im_end|>"],
+                                         model=plan.model, seed=plan.seed):
+                if cancel.is_set():
+                    break  # closing the generator drops the request
+                with self._cond:
+                    prefetch.tokens.append(token)
+                    self._cond.notify_all()
+        except Exception as e:
+            prefetch.error = e
+            print(f"[Prefetch] Failed: {e}")
+        with self._cond:
+            prefetch.done = True
+            self._cond.notify_all()
+
+    def cancel(self, reason: str = ""):
+        """Stop the running prefetch and forget its result."""
+        with self._cond:
+            prefetch = self._current
+            if prefetch is None:
+                return
+            self._current = None
+            self._cancel.set()
+            self._cond.notify_all()
+        if not prefetch.taken:
+            self.discarded += 1
+            if reason:
+                print(f"[Prefetch] Cancelled: {reason}")
+
+    def take(self) -> Optional[ProgramPlan]:
+        """Claim the prefetched program, if it is still usable.
+
+        Returns the plan, or None if there is nothing to use (no prefetch,
+        generation failed before producing anything, or the model setting
+        changed since it was planned). Read the code with tokens().
+        """
+        with self._cond:
+            prefetch = self._current
+        if prefetch is None or prefetch.taken:
+            return None
+        if prefetch.plan.model_setting != self.llm.model_setting:
+            self.cancel("model setting changed")
+            return None
+        if prefetch.error is not None and not prefetch.tokens:
+            self.cancel()
+            return None
+        prefetch.taken = True
+        self.used += 1
+        return prefetch.plan
+
+    def tokens(self) -> Iterator[str]:
+        """Tokens of the program returned by the last take().
+
+        Replays what was buffered, then waits for the rest if generation
+        is still running. Re-raises a generation error after the last
+        buffered token, like a live stream would. cancel() ends it early.
+        """
+        prefetch = self._current
+        if prefetch is None or not prefetch.taken:
+            return
+        i = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: i < len(prefetch.tokens) or prefetch.done
+                                    or self._current is not prefetch)
+                batch = prefetch.tokens[i:]
+                finished = prefetch.done or self._current is not prefetch
+            i += len(batch)
+            yield from batch
+            if finished and i >= len(prefetch.tokens):
+                break
+        if prefetch.error is not None:
+            raise prefetch.error
+
+    def stats(self) -> dict:
+        """Counters for the status API."""
+        with self._cond:
+            buffered = len(self._current.tokens) if self.active else 0
+        return {
+            "active": self.active,
+            "buffered_tokens": buffered,
+            "started": self.started,
+            "used": self.used,
+            "discarded": self.discarded,
+        }
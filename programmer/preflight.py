@@ -0,0 +1,110 @@
+"""
+Pre-flight Runs
+
+Before a program gets the canvas popup, REVIEW runs it headless for a
+few frames (TINY_CANVAS_PREFLIGHT, see tiny_canvas.Canvas): draws are
+only counted and checked, sleeps don't block. Programs without a Canvas
+count time.sleep() calls as frames (programs/tiny_runner.py), so anything
+that paces itself finishes in milliseconds on the warm runner. Programs
+that never sleep run until the timeout; the caller's tick keeps the
+display alive meanwhile. A traceback sends the program straight to FIX
+instead of failing on screen.
+"""
+
+import json
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from programmer.program_output import ProgramOutput
+
+_MARKER = "PREFLIGHT:"
+_POLL = 0.02  # seconds per wait step
+_TICK_INTERVAL = 1.0 / 30  # fast runs finish before the first tick
+
+
+@dataclass
+class PreflightResult:
+    """What a pre-flight run found."""
+    ok: bool
+    error: Optional[str] = None  # traceback / output tail when not ok
+    frames: int = 0
+    commands: int = 0
+    ops: Dict[str, int] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+    dropped: int = 0  # draws whose colour isn't numbers: never drawn
+    coerced: int = 0  # draws with other bad colours: dropped by the text protocol
+    timed_out: bool = False  # still running at the deadline (inconclusive)
+    elapsed_ms: float = 0.0
+
+
+def run_preflight(runner, code: str, env: Dict[str, str], frames: int,
+                  timeout: float, tick: Optional[Callable[[], None]] = None) -> PreflightResult:
+    """
+    Run code headless for up to frames frames.
+
+    Args:
+        runner: ProgramRunner to start the program with
+        code: program source
+        env: program environment (TINY_CANVAS_PREFLIGHT is added)
+        frames: frames to record before stopping the program
+        timeout: seconds (real time) before giving up on it
+        tick: called about 30 times a second while waiting, e.g.
+              Terminal.tick to keep the display and event pump running
+
+    Returns:
+        PreflightResult; ok unless the program crashed
+    """
+    start = time.monotonic()
+    proc = runner.run(code, dict(env, TINY_CANVAS_PREFLIGHT=str(frames)))
+    output = ProgramOutput(proc.stdout.fileno(), tail_lines=40)
+    lines = []
+    deadline = start + timeout
+    last_tick = start
+
+    def keep_ticking():
+        nonlocal last_tick
+        now = time.monotonic()
+        if tick is not None and now - last_tick >= _TICK_INTERVAL:
+            tick()
+            last_tick = time.monotonic()
+
+    while output.stdout_open and time.monotonic() < deadline:
+        lines.extend(output.drain(timeout=min(_POLL, max(0.0, deadline - time.monotonic())))[1])
+        keep_ticking()
+
+    timed_out = False
+    exit_code = None
+    while exit_code is None:
+        try:
+            exit_code = proc.wait(timeout=min(_POLL, max(0.0, deadline - time.monotonic())))
+        except subprocess.TimeoutExpired:
+            if time.monotonic() >= deadline:
+                timed_out = True
+                proc.kill()
+                exit_code = proc.wait(timeout=1.0)
+            else:
+                keep_ticking()
+    lines.extend(output.read_remaining(timeout=0.1).splitlines(True))
+    proc.stdout.close()
+    elapsed_ms = (time.monotonic() - start) * 1000
+
+    stats = None
+    for line in lines:
+        if line.startswith(_MARKER):
+            try:
+                stats = json.loads(line[len(_MARKER):])
+            except ValueError:
+                pass
+    if stats is not None:
+        return PreflightResult(ok=True, frames=stats.get("frames", 0),
+                               commands=stats.get("commands", 0), ops=stats.get("ops", {}),
+                               warnings=stats.get("warnings", []), dropped=stats.get("dropped", 0),
+                               coerced=stats.get("coerced", 0), elapsed_ms=elapsed_ms)
+    if timed_out or exit_code == 0:
+        # Finished without ending enough frames, or busy without drawing:
+        # nothing to hold against it here
+        return PreflightResult(ok=True, timed_out=timed_out, elapsed_ms=elapsed_ms)
+    error = "".join(output.tail).strip() or f"Process exited with code {exit_code}"
+    return PreflightResult(ok=False, error=error, elapsed_ms=elapsed_ms)
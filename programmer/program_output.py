@@ -0,0 +1,230 @@
+"""
+Program Output Reader
+
+Non-blocking reader for a running program's stdout and binary draw pipe.
+
+The WATCH loop calls drain() once per display frame. Each call empties
+everything the program has written so far (up to a budget) instead of a
+single line, so ingestion keeps up with programs that draw far more than
+one command per display frame. Backlog metrics show whether we do.
+
+An optional rate cap bounds how many bytes per second we read at all:
+a program that writes faster fills its pipe and blocks, instead of
+flooding the renderer.
+"""
+
+import collections
+import fcntl
+import os
+import select
+import struct
+import termios
+import time
+from typing import List, Optional, Tuple
+
+from display.canvas_protocol import RecordDecoder, Record, parse_text_command
+
+_READ_CHUNK = 65536
+
+
+def _pending_bytes(fd: int) -> int:
+    """Bytes waiting in the kernel pipe buffer (FIONREAD)."""
+    try:
+        buf = fcntl.ioctl(fd, termios.FIONREAD, b"\0\0\0\0")
+        return struct.unpack("i", buf)[0]
+    except OSError:
+        return 0
+
+
+class ProgramOutput:
+    """
+    Drains a child program's output pipes without blocking.
+
+    stdout carries text (and "CMD:" draw commands from the text protocol);
+    the optional draw pipe carries binary records. Both are decoded into
+    draw records; plain text lines are returned separately.
+    """
+
+    def __init__(self, stdout_fd: int, draw_fd: Optional[int] = None,
+                 byte_budget: int = 1 << 20, line_budget: int = 64,
+                 tail_lines: int = 20, rate_limit: int = 0):
+        """
+        Args:
+            stdout_fd: read end of the program's stdout/stderr pipe
+            draw_fd: read end of the binary draw pipe, if offered (owned —
+                     closed by close_draw())
+            byte_budget: max bytes read per pipe per drain() call
+            line_budget: max plain text lines returned per drain() call
+            tail_lines: how many recent text lines to keep for error reports
+            rate_limit: max bytes/s read from both pipes together (0 = no cap)
+        """
+        self.stdout_fd = stdout_fd
+        self.draw_fd = draw_fd
+        self.byte_budget = byte_budget
+        self.line_budget = line_budget
+        self.rate_limit = rate_limit
+        self._allowance = float(rate_limit)  # token bucket, one second of burst
+        self._refilled = time.monotonic()
+
+        os.set_blocking(stdout_fd, False)
+        if draw_fd is not None:
+            os.set_blocking(draw_fd, False)
+
+        self._decoder = RecordDecoder()
+        self._partial_line = b""
+        self._text_lines: collections.deque = collections.deque()
+        self.tail: collections.deque = collections.deque(maxlen=tail_lines)
+        self.stdout_open = True
+        self.draw_open = draw_fd is not None
+
+        # Metrics
+        self._started = time.monotonic()
+        self.drains = 0
+        self.records_total = 0
+        self.bytes_total = 0
+        self.budget_hits = 0
+        self.throttled = 0
+        self.backlog_bytes = 0
+        self.max_backlog_bytes = 0
+
+    # -------------------------------------------------------------------------
+
+    def _refill(self):
+        """Top up the rate-limit allowance for the time since the last drain."""
+        now = time.monotonic()
+        self._allowance = min(float(self.rate_limit),
+                              self._allowance + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+
+    def _read_fd(self, fd: int) -> Tuple[bytes, bool]:
+        """Read up to byte_budget (and the rate allowance) from fd. Returns (data, eof)."""
+        budget = self.byte_budget
+        if self.rate_limit > 0:
+            budget = min(budget, int(self._allowance))
+            if budget <= 0:
+                self.throttled += 1
+                return b"", False
+        chunks = []
+        total = 0
+        while total < budget:
+            try:
+                data = os.read(fd, min(_READ_CHUNK, budget - total))
+            except BlockingIOError:
+                return b"".join(chunks), False
+            except OSError:
+                return b"".join(chunks), True
+            if not data:
+                return b"".join(chunks), True
+            chunks.append(data)
+            total += len(data)
+            if self.rate_limit > 0:
+                self._allowance -= len(data)
+        self.budget_hits += 1
+        return b"".join(chunks), False
+
+    def _split_stdout(self, data: bytes, records: List[Record]):
+        """Split stdout bytes into lines; CMD: lines become records."""
+        data = self._partial_line + data
+        lines = data.split(b"\n")
+        self._partial_line = lines.pop()
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace") + "\n"
+            if line.startswith("CMD:"):
+                record = parse_text_command(line)
+                if record is not None:
+                    records.append(record)
+            else:
+                self._text_lines.append(line)
+                self.tail.append(line)
+
+    def drain(self, timeout: float = 0.0) -> Tuple[List[Record], List[str]]:
+        """
+        Read everything currently available on both pipes.
+
+        Args:
+            timeout: how long to wait for the first byte if nothing is ready
+
+        Returns:
+            (draw records in arrival order, plain text lines)
+        """
+        records: List[Record] = []
+        fds = []
+        if self.stdout_open:
+            fds.append(self.stdout_fd)
+        if self.draw_open:
+            fds.append(self.draw_fd)
+
+        if fds:
+            if self.rate_limit > 0:
+                self._refill()
+            try:
+                ready, _, _ = select.select(fds, [], [], timeout)
+            except (OSError, ValueError):
+                ready = []
+
+            if self.draw_open and self.draw_fd in ready:
+                data, eof = self._read_fd(self.draw_fd)
+                if data:
+                    self.bytes_total += len(data)
+                    records.extend(self._decoder.feed(data))
+                if eof:
+                    self.draw_open = False
+
+            if self.stdout_open and self.stdout_fd in ready:
+                data, eof = self._read_fd(self.stdout_fd)
+                if data:
+                    self.bytes_total += len(data)
+                    self._split_stdout(data, records)
+                if eof:
+                    self.stdout_open = False
+                    if self._partial_line:
+                        self._split_stdout(b"\n", records)
+
+        self.drains += 1
+        self.records_total += len(records)
+        self.backlog_bytes = sum(_pending_bytes(fd) for fd in fds)
+        self.max_backlog_bytes = max(self.max_backlog_bytes, self.backlog_bytes)
+
+        lines = []
+        while self._text_lines and len(lines) < self.line_budget:
+            lines.append(self._text_lines.popleft())
+        return records, lines
+
+    def read_remaining(self, timeout: float = 1.0) -> str:
+        """Collect any text still in flight after the program exited."""
+        deadline = time.monotonic() + timeout
+        lines = []
+        while self.stdout_open and time.monotonic() < deadline:
+            lines.extend(self.drain(timeout=0.05)[1])
+        lines.extend(self._text_lines)
+        self._text_lines.clear()
+        return "".join(lines)
+
+    def close_draw(self):
+        """Close the draw pipe; stdout stays readable for error reports."""
+        if self.draw_fd is not None:
+            try:
+                os.close(self.draw_fd)
+            except OSError:
+                pass
+            self.draw_fd = None
+        self.draw_open = False
+
+    @property
+    def closed(self) -> bool:
+        """True once both pipes hit EOF."""
+        return not self.stdout_open and not self.draw_open
+
+    def stats(self) -> dict:
+        """Ingestion metrics for the status API."""
+        elapsed = max(0.001, time.monotonic() - self._started)
+        return {
+            "records_per_sec": round(self.records_total / elapsed),
+            "records_total": self.records_total,
+            "bytes_total": self.bytes_total,
+            "backlog_bytes": self.backlog_bytes,
+            "max_backlog_bytes": self.max_backlog_bytes,
+            "budget_hits": self.budget_hits,
+            "throttled": self.throttled,
+            "drains": self.drains,
+        }
@@ -0,0 +1,328 @@
+"""
+Program Runner
+
+Starts generated programs. With WARM_RUNNER on, a long-lived "zygote"
+(programs/tiny_runner.py) has already paid for interpreter startup and the
+canvas imports; each program is a fork of it, started in milliseconds.
+The program's stdout pipe, draw pipe and pixel buffer fds are handed over
+with SCM_RIGHTS, and it gets the same minimal environment as before.
+
+Programs are passed as source, never written to disk: in the control
+message for warm starts, on stdin of `tiny_runner.py -` for cold ones.
+
+run() returns a Popen-like handle either way: if the zygote can't be
+started or dies, programs fall back to a cold subprocess. Both paths
+apply the resource limits from programmer/sandbox.py.
+"""
+
+import errno
+import itertools
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+import config
+from programmer.sandbox import ResourceLimits
+
+RUNNER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "programs", "tiny_runner.py")
+
+_MAX_MESSAGE = 1 << 20
+
+
+class WarmProcess:
+    """
+    A program forked by the zygote, with the subset of subprocess.Popen
+    the Brain uses: pid, stdout, poll(), wait(), terminate(), kill().
+
+    The program is the zygote's child, not ours, so its exit status comes
+    from the zygote over the control socket.
+    """
+
+    def __init__(self, runner: "ProgramRunner", pid: int, stdout_fd: int):
+        self._runner = runner
+        self.pid = pid
+        self.stdout = os.fdopen(stdout_fd, "rb", buffering=0)
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None:
+            self.returncode = self._runner._exit_code(self.pid)
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(RUNNER_SCRIPT, timeout)
+            self._runner._wait_exit(self.pid, remaining)
+        return self.returncode
+
+    def send_signal(self, sig: int):
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class ProgramRunner:
+    """
+    Runs programs from a warm zygote, or cold subprocesses as a fallback.
+    """
+
+    def __init__(self, warm: Optional[bool] = None, limits: Optional[ResourceLimits] = None):
+        """
+        Args:
+            warm: use the zygote (defaults to config.WARM_RUNNER)
+            limits: per-program resource limits (defaults to config)
+        """
+        self.warm = getattr(config, "WARM_RUNNER", True) if warm is None else warm
+        self.limits = limits if limits is not None else ResourceLimits.from_config()
+        self._zygote: Optional[subprocess.Popen] = None
+        self._sock: Optional[socket.socket] = None
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._replies: Dict[int, dict] = {}  # request id -> {"pid"} or {"error"}
+        self._exits: Dict[int, int] = {}  # pid -> exit code
+        self._alive = False
+
+        # Metrics
+        self.warm_starts = 0
+        self.cold_starts = 0
+        self.last_start_ms = 0.0
+
+    # -------------------------------------------------------------------------
+    # Zygote lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Start the zygote if needed. Returns True if it is running."""
+        if not self.warm:
+            return False
+        if self._alive and self._zygote and self._zygote.poll() is None:
+            return True
+        self.stop()
+        try:
+            parent_sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        except (OSError, AttributeError) as e:
+            print(f"[Runner] Warm runner unavailable: {e}")
+            self.warm = False
+            return False
+        try:
+            # Minimal environment, like the programs themselves: children
+            # are forks, so anything in the zygote's env would leak to them
+            env = {
+                "PATH": os.environ.get("PATH", ""),
+                "HOME": os.environ.get("HOME", ""),
+                "PYTHONPATH": os.environ.get("PYTHONPATH", ""),
+            }
+            self._zygote = subprocess.Popen(
+                [sys.executable, "-u", RUNNER_SCRIPT, str(child_sock.fileno())],
+                stdin=subprocess.DEVNULL,
+                env=env,
+                pass_fds=(child_sock.fileno(),),
+                start_new_session=True,  # Ctrl+C on the console is for us only
+            )
+        except OSError as e:
+            print(f"[Runner] Could not start warm runner: {e}")
+            parent_sock.close()
+            return False
+        finally:
+            child_sock.close()
+
+        self._sock = parent_sock
+        self._alive = True
+        threading.Thread(target=self._read_loop, args=(parent_sock,),
+                         name="runner-control", daemon=True).start()
+        print(f"[Runner] Warm runner started (pid {self._zygote.pid})")
+        return True
+
+    def stop(self):
+        """Shut the zygote down. Running programs are left alone."""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if self._zygote is not None:
+            try:
+                self._zygote.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                self._zygote.kill()
+            self._zygote = None
+        self._alive = False
+
+    def _kill_session(self):
+        """Kill the zygote and every program it forked (its own session)."""
+        if self._zygote is None:
+            return
+        try:
+            os.killpg(self._zygote.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _read_loop(self, sock: socket.socket):
+        """Collect fork replies and exit statuses from the zygote."""
+        while True:
+            try:
+                data = sock.recv(_MAX_MESSAGE)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            try:
+                msg = json.loads(data)
+            except ValueError:
+                continue
+            with self._cond:
+                if "exit" in msg:
+                    self._exits[msg["pid"]] = msg["exit"]
+                elif "id" in msg:
+                    self._replies[msg["id"]] = msg
+                self._cond.notify_all()
+        with self._cond:
+            if self._sock is sock:
+                self._alive = False
+                print("[Runner] Warm runner exited")
+            self._cond.notify_all()
+
+    def _exit_code(self, pid: int) -> Optional[int]:
+        with self._cond:
+            if pid in self._exits:
+                return self._exits.pop(pid)
+            if self._alive:
+                return None
+        # The zygote is gone, and with it the exit status: check liveness.
+        # As PID 1 (in a container) orphans are reparented to us, so reap.
+        try:
+            reaped, status = os.waitpid(pid, os.WNOHANG)
+            if reaped == pid:
+                return os.waitstatus_to_exitcode(status)
+        except ChildProcessError:
+            pass
+        try:
+            os.kill(pid, 0)
+            return None
+        except ProcessLookupError:
+            return 1
+        except PermissionError:
+            return None
+
+    def _wait_exit(self, pid: int, timeout: Optional[float]):
+        with self._cond:
+            self._cond.wait_for(lambda: pid in self._exits or not self._alive,
+                                timeout if timeout is not None else 0.5)
+        if not self._alive:
+            time.sleep(0.05)  # polling liveness with os.kill
+
+    # -------------------------------------------------------------------------
+    # Running programs
+    # -------------------------------------------------------------------------
+
+    def run(self, code: str, env: Dict[str, str], pass_fds: Sequence[int] = (),
+            fd_env: Optional[Dict[str, int]] = None, filename: str = "<program>"):
+        """
+        Start a program with stdout+stderr on a fresh pipe.
+
+        Args:
+            code: program source
+            env: complete environment for the program
+            pass_fds: extra fds the program inherits
+            fd_env: env var -> fd for vars that name one of pass_fds (the
+                    warm path renumbers fds, so these are rewritten)
+            filename: name the program has in tracebacks
+
+        Returns:
+            WarmProcess or subprocess.Popen
+        """
+        start = time.monotonic()
+        proc = None
+        if self.start():
+            proc = self._run_warm(code, filename, env, pass_fds, fd_env or {})
+        if proc is None:
+            proc = subprocess.Popen(
+                [sys.executable, "-u", RUNNER_SCRIPT, "-", filename],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,  # Drained non-blocking by ProgramOutput
+                env=env,
+                pass_fds=tuple(pass_fds),
+            )
+            self.limits.apply_to(proc.pid)  # still in interpreter startup
+            try:
+                proc.stdin.write(code.encode())
+            except BrokenPipeError:
+                pass  # died already; its output says why
+            proc.stdin.close()
+            self.cold_starts += 1
+        else:
+            self.warm_starts += 1
+        self.last_start_ms = (time.monotonic() - start) * 1000
+        kind = "warm" if isinstance(proc, WarmProcess) else "cold"
+        print(f"[Runner] Started program ({kind}, {self.last_start_ms:.1f}ms)")
+        return proc
+
+    def _run_warm(self, code, filename, env, pass_fds, fd_env) -> Optional[WarmProcess]:
+        """Ask the zygote to fork the program; None if that fails."""
+        out_r, out_w = os.pipe()
+        fds = [out_w] + list(pass_fds)
+        request_id = next(self._ids)
+        msg = {
+            "id": request_id,
+            "code": code,
+            "filename": filename,
+            "env": {k: v for k, v in env.items() if k not in fd_env},
+            "fd_env": {k: fds.index(fd) for k, fd in fd_env.items() if fd in fds},
+            "limits": self.limits.to_dict(),
+        }
+        try:
+            socket.send_fds(self._sock, [json.dumps(msg).encode()], fds)
+        except (OSError, AttributeError) as e:
+            print(f"[Runner] Warm start failed, running cold: {e}")
+            os.close(out_r)
+            os.close(out_w)
+            if getattr(e, "errno", None) != errno.EMSGSIZE:  # too big is fine next time
+                self.stop()
+            return None
+        os.close(out_w)  # the zygote has its own copy
+
+        with self._cond:
+            self._cond.wait_for(lambda: request_id in self._replies or not self._alive, 5.0)
+            reply = self._replies.pop(request_id, None)
+        if not reply or "pid" not in reply:
+            error = reply.get("error") if reply else "no reply"
+            print(f"[Runner] Warm start failed, running cold: {error}")
+            os.close(out_r)
+            if not reply:
+                # It may have forked the program all the same; nobody would
+                # own it (or drain its output) once we run a cold copy
+                self._kill_session()
+            self.stop()
+            return None
+        return WarmProcess(self, reply["pid"], out_r)
+
+    def stats(self) -> dict:
+        """Counters for the status API."""
+        return {
+            "warm": self._alive,
+            "warm_starts": self.warm_starts,
+            "cold_starts": self.cold_starts,
+            "last_start_ms": round(self.last_start_ms, 1),
+        }
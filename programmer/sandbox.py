@@ -0,0 +1,159 @@
+"""
+Program Sandbox
+
+Resource limits for generated programs, so a runaway loop that allocates
+or floods output can't starve the renderer and web server on a small
+board:
+
+- RLIMIT_AS caps address space (allocations fail with MemoryError)
+- RLIMIT_NOFILE caps open files
+- nice lowers CPU priority; with a delegated cgroup v2 directory, cpu.max
+  and memory.max cap CPU rate and memory hard
+- Watchdog kills a program whose RSS grows past the limit anyway and
+  explains why a program died, for the archive
+
+Limits are applied inside the child before the program starts (warm
+runner) or from outside right after spawn (cold fallback, while the
+interpreter is still starting up). Output is rate-capped separately by
+ProgramOutput.
+"""
+
+import os
+import resource
+import signal
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import config
+
+_CPU_PERIOD_US = 100000
+_CHECK_INTERVAL = 0.5  # seconds between /proc reads
+
+
+@dataclass
+class ResourceLimits:
+    """Limits for one program. 0 / None means "no limit"."""
+    memory_mb: int = 0
+    max_open_files: int = 0
+    nice: int = 0
+    cgroup: Optional[str] = None  # cgroup v2 directory programs join
+
+    @classmethod
+    def from_config(cls) -> "ResourceLimits":
+        limits = cls(
+            memory_mb=getattr(config, "PROGRAM_MEMORY_LIMIT_MB", 0),
+            max_open_files=getattr(config, "PROGRAM_MAX_OPEN_FILES", 0),
+            nice=getattr(config, "PROGRAM_NICE", 0),
+        )
+        path = getattr(config, "PROGRAM_CGROUP", "")
+        if path and setup_cgroup(path, getattr(config, "PROGRAM_CPU_QUOTA", 0.0),
+                                 limits.memory_mb):
+            limits.cgroup = path
+        return limits
+
+    def to_dict(self) -> dict:
+        """For the warm runner's control message (see programs/tiny_runner.py)."""
+        return asdict(self)
+
+    def apply_to(self, pid: int):
+        """Apply the limits to an already running process (best effort)."""
+        try:
+            if self.memory_mb > 0:
+                size = self.memory_mb * 1024 * 1024
+                resource.prlimit(pid, resource.RLIMIT_AS, (size, size))
+            if self.max_open_files > 0:
+                resource.prlimit(pid, resource.RLIMIT_NOFILE,
+                                 (self.max_open_files, self.max_open_files))
+            if self.nice > 0:
+                os.setpriority(os.PRIO_PROCESS, pid, self.nice)
+            if self.cgroup:
+                with open(os.path.join(self.cgroup, "cgroup.procs"), "w") as f:
+                    f.write(str(pid))
+        except (OSError, ValueError) as e:
+            print(f"[Sandbox] Could not limit pid {pid}: {e}")
+
+
+def setup_cgroup(path: str, cpu_quota: float, memory_mb: int) -> bool:
+    """
+    Create/configure a cgroup v2 directory for programs.
+
+    The directory (or its parent) must be delegated to us and have the cpu
+    and memory controllers enabled. Returns False if it can't be used.
+
+    Args:
+        path: e.g. /sys/fs/cgroup/tiny-programmer/programs
+        cpu_quota: fraction of one CPU (0.5 = half a core, 0 = unlimited)
+        memory_mb: memory.max (0 = unlimited)
+    """
+    try:
+        os.makedirs(path, exist_ok=True)
+        if cpu_quota > 0:
+            with open(os.path.join(path, "cpu.max"), "w") as f:
+                f.write(f"{int(cpu_quota * _CPU_PERIOD_US)} {_CPU_PERIOD_US}")
+        if memory_mb > 0:
+            with open(os.path.join(path, "memory.max"), "w") as f:
+                f.write(str(memory_mb * 1024 * 1024))
+        print(f"[Sandbox] Programs run in cgroup {path}")
+        return True
+    except OSError as e:
+        print(f"[Sandbox] cgroup {path} unavailable: {e}")
+        return False
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of pid in MB, from /proc."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class Watchdog:
+    """
+    Watches a running program and records why it was killed.
+
+    check() is called from the WATCH loop (every frame is fine, it reads
+    /proc at most every half second); it returns a reason once the program
+    has to go. explain() turns an unexpected exit into a reason.
+    """
+
+    def __init__(self, pid: int, limits: ResourceLimits):
+        self.pid = pid
+        self.limits = limits
+        self.kill_reason: Optional[str] = None
+        self.peak_rss_mb = 0.0
+        self._checked = 0.0
+
+    def check(self) -> Optional[str]:
+        """Return a kill reason if the program exceeded a limit."""
+        now = time.monotonic()
+        if self.kill_reason or now - self._checked < _CHECK_INTERVAL:
+            return self.kill_reason
+        self._checked = now
+        rss = _rss_mb(self.pid)
+        if rss is None:
+            return None
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        if self.limits.memory_mb > 0 and rss > self.limits.memory_mb:
+            self.kill_reason = (f"memory: using {rss:.0f} MB, "
+                                f"limit is {self.limits.memory_mb} MB")
+        return self.kill_reason
+
+    def explain(self, exit_code: Optional[int], output_tail: str = "") -> Optional[str]:
+        """Why the program died, if a limit was the cause."""
+        if self.kill_reason:
+            return self.kill_reason
+        if exit_code == -signal.SIGKILL:
+            self.kill_reason = "killed by the kernel (out of memory?)"
+        elif exit_code == -signal.SIGXCPU:
+            self.kill_reason = "cpu time limit"
+        elif exit_code and "MemoryError" in output_tail:
+            self.kill_reason = f"memory: hit the {self.limits.memory_mb} MB limit"
+        elif exit_code and "Too many open files" in output_tail:
+            self.kill_reason = f"open files: hit the {self.limits.max_open_files} file limit"
+        return self.kill_reason
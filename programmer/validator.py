@@ -0,0 +1,374 @@
+"""
+Static Program Validator
+
+REVIEW's first line of defence: an AST pass over generated code, before
+anything runs.
+
+- imports: banned libraries (also via __import__/importlib and inside
+  `import a, b`) and modules that don't exist
+- canvas calls: every c.<method>(...) / p.<method>(...) on a Canvas or
+  Plot3D is checked against the real tiny_canvas/tiny_plot3d classes,
+  including argument counts
+- loops: `while True` without c.sleep()/c.show()/time.sleep() never ends
+  a frame: it spins at 100% CPU and floods the draw pipe (a warning;
+  whether it actually works is for the pre-flight run to find out)
+- cost: estimated draw calls per frame, for the log and per-pixel warnings
+
+Results are cached by code hash. Diagnostics are structured so the fix
+prompt can list them line by line.
+"""
+
+import ast
+import collections
+import difflib
+import hashlib
+import importlib.util
+import inspect
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+BANNED_MODULES = ("pygame", "turtle", "tkinter", "matplotlib")
+
+# Calls that end a frame (the canvas presents on them)
+_FRAME_METHODS = ("sleep", "show", "run")  # run: Plot3D's own loop
+_SLEEP_FUNCTIONS = ("sleep",)  # time.sleep / from time import sleep
+
+# Draw calls per frame above which per-pixel drawing is probably too slow
+_HEAVY_FRAME = 20000
+# Iterations assumed for loops whose count isn't a literal range()
+_UNKNOWN_ITERATIONS = 10
+
+_CACHE_SIZE = 128
+_cache: "collections.OrderedDict[str, ValidationResult]" = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+_PROGRAMS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "programs")
+_LOCAL_MODULES = ("tiny_canvas", "tiny_plot3d")
+_api: Optional[Dict[str, type]] = None
+
+
+@dataclass
+class Diagnostic:
+    """One problem found in the code."""
+    line: int
+    severity: str  # "error" (must fix before running) or "warning"
+    kind: str  # e.g. "banned-import", "unknown-method", "no-frame"
+    message: str
+
+    def __str__(self) -> str:
+        if not self.line:  # not tied to a line (e.g. found by the pre-flight run)
+            return self.message
+        return f"line {self.line}: {self.message}"
+
+
+@dataclass
+class ValidationResult:
+    """All diagnostics for one program."""
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    draw_calls_per_frame: Optional[int] = None
+
+    @property
+    def errors(self) -> List[Diagnostic]:
+        return [d for d in self.diagnostics if d.severity == "error"]
+
+    @property
+    def warnings(self) -> List[Diagnostic]:
+        return [d for d in self.diagnostics if d.severity == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _load_api() -> Dict[str, type]:
+    """The real Canvas and Plot3D classes, loaded from programs/."""
+    global _api
+    if _api is None:
+        api = {}
+        for module_name, class_name in (("tiny_canvas", "Canvas"), ("tiny_plot3d", "Plot3D")):
+            try:
+                spec = importlib.util.spec_from_file_location(
+                    f"_validator_{module_name}", os.path.join(_PROGRAMS_DIR, f"{module_name}.py"))
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                api[class_name] = getattr(module, class_name)
+            except Exception as e:
+                print(f"[Validator] Could not load {module_name}: {e}")
+        _api = api
+    return _api
+
+
+def _module_exists(name: str) -> bool:
+    top = name.split(".")[0]
+    if top in _LOCAL_MODULES or top in sys.builtin_module_names:
+        return True
+    try:
+        return importlib.util.find_spec(top) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    """"c" for Name c, "self.c" for Attribute self.c, else None."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _dotted(node.value)
+        return f"{base}.{node.attr}" if base else None
+    return None
+
+
+class _Checker:
+    """One validation pass over a parsed module."""
+
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+        self.api = _load_api()
+        self.diagnostics: List[Diagnostic] = []
+        self.instances: Dict[str, str] = {}  # variable ("c", "self.canvas") -> class name
+        self.frame_functions: Set[str] = set()  # functions that end a frame
+
+    def add(self, node, severity, kind, message):
+        self.diagnostics.append(Diagnostic(getattr(node, "lineno", 0), severity, kind, message))
+
+    # -------------------------------------------------------------------------
+    # Imports
+    # -------------------------------------------------------------------------
+
+    def check_import(self, node, name: str):
+        top = name.split(".")[0]
+        if top in BANNED_MODULES:
+            self.add(node, "error", "banned-import",
+                     f"Forbidden library usage: {top} (draw with tiny_canvas instead)")
+        elif not _module_exists(name):
+            self.add(node, "error", "missing-module", f"No module named '{top}'")
+
+    def check_imports(self):
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    self.check_import(node, alias.name)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                self.check_import(node, node.module)
+            elif isinstance(node, ast.Call):
+                func = _dotted(node.func)
+                if (func in ("__import__", "importlib.import_module") and node.args
+                        and isinstance(node.args[0], ast.Constant)
+                        and isinstance(node.args[0].value, str)):
+                    self.check_import(node, node.args[0].value)
+
+    # -------------------------------------------------------------------------
+    # Canvas / Plot3D calls
+    # -------------------------------------------------------------------------
+
+    def find_instances(self):
+        """Variables bound to Canvas(...) or Plot3D(...)."""
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+                cls = _dotted(node.value.func)
+                cls = cls.split(".")[-1] if cls else None
+                if cls in self.api:
+                    for target in node.targets:
+                        name = _dotted(target)
+                        if name:
+                            self.instances[name] = cls
+
+    def check_call(self, node: ast.Call, cls_name: str, method: str):
+        cls = self.api[cls_name]
+        attr = inspect.getattr_static(cls, method, None)
+        if attr is None:
+            public = [m for m in dir(cls) if not m.startswith("_")]
+            close = difflib.get_close_matches(method, public, n=1)
+            hint = f" (did you mean {close[0]}()?)" if close else ""
+            self.add(node, "error", "unknown-method", f"{cls_name} has no method {method}(){hint}")
+            return
+        if not callable(attr):
+            self.add(node, "error", "not-callable", f"{cls_name}.{method} is not a method")
+            return
+        if any(isinstance(a, ast.Starred) for a in node.args) or any(k.arg is None for k in node.keywords):
+            return  # *args / **kwargs: can't count
+        try:
+            sig = inspect.signature(attr)
+            sig.bind(None, *node.args, **{k.arg: None for k in node.keywords})
+        except TypeError as e:
+            self.add(node, "error", "bad-arguments", f"{cls_name}.{method}(): {e}")
+        except ValueError:
+            pass
+
+    def check_calls(self):
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+                owner = _dotted(node.func.value)
+                if owner in self.instances:
+                    self.check_call(node, self.instances[owner], node.func.attr)
+
+    # -------------------------------------------------------------------------
+    # Frames and draw cost
+    # -------------------------------------------------------------------------
+
+    def ends_frame(self, call: ast.Call) -> bool:
+        func = call.func
+        if isinstance(func, ast.Attribute):
+            owner = _dotted(func.value)
+            if owner in self.instances and func.attr in _FRAME_METHODS:
+                return True
+            if func.attr in _SLEEP_FUNCTIONS:
+                return True
+        name = _dotted(func)
+        return name in _SLEEP_FUNCTIONS or name in self.frame_functions or (
+            isinstance(func, ast.Attribute) and func.attr in self.frame_functions)
+
+    def _calls(self, nodes):
+        """Calls in nodes, not descending into nested function definitions."""
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+                continue
+            if isinstance(node, ast.Call):
+                yield node
+            stack.extend(ast.iter_child_nodes(node))
+
+    def find_frame_functions(self):
+        """Functions (and methods) that end a frame, directly or via each other."""
+        functions = [n for n in ast.walk(self.tree)
+                     if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        changed = True
+        while changed:
+            changed = False
+            for fn in functions:
+                if fn.name not in self.frame_functions and any(
+                        self.ends_frame(c) for c in self._calls(fn.body)):
+                    self.frame_functions.add(fn.name)
+                    changed = True
+
+    def is_draw_call(self, call: ast.Call) -> bool:
+        func = call.func
+        return (isinstance(func, ast.Attribute) and self.instances.get(_dotted(func.value)) == "Canvas"
+                and func.attr not in _FRAME_METHODS)
+
+    def draw_cost(self, stmts) -> int:
+        """Estimated draw calls for one pass over stmts."""
+        total = 0
+        for stmt in stmts:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            if isinstance(stmt, (ast.For, ast.While)):
+                total += self.draw_cost(stmt.body) * self.iterations(stmt)
+                continue
+            # Calls in the statement itself (or an if/with header), then
+            # its nested blocks
+            for child in ast.iter_child_nodes(stmt):
+                if not isinstance(child, ast.stmt):
+                    total += sum(1 for call in self._calls([child]) if self.is_draw_call(call))
+            for block in ("body", "orelse", "finalbody"):
+                inner = getattr(stmt, block, None)
+                if isinstance(inner, list):
+                    total += self.draw_cost(inner)
+        return total
+
+    @staticmethod
+    def iterations(loop) -> int:
+        if (isinstance(loop, ast.For) and isinstance(loop.iter, ast.Call)
+                and _dotted(loop.iter.func) == "range"
+                and all(isinstance(a, ast.Constant) and isinstance(a.value, int)
+                        for a in loop.iter.args)):
+            return max(0, len(range(*[a.value for a in loop.iter.args])))
+        return _UNKNOWN_ITERATIONS
+
+    @staticmethod
+    def is_forever(loop: ast.While) -> bool:
+        return isinstance(loop.test, ast.Constant) and bool(loop.test.value)
+
+    @staticmethod
+    def exits(loop: ast.While) -> bool:
+        """A break (of this loop) or return/raise/sys.exit anywhere inside."""
+        stack = list(loop.body)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, (ast.Return, ast.Raise)):
+                return True
+            if isinstance(node, ast.Break):
+                return True
+            if isinstance(node, ast.Call) and _dotted(node.func) in ("sys.exit", "exit", "quit"):
+                return True
+            if isinstance(node, (ast.For, ast.While)):
+                # A break in a nested loop only leaves that loop
+                stack.extend(n for n in ast.walk(node) if isinstance(n, (ast.Return, ast.Raise)))
+                continue
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+                continue
+            stack.extend(ast.iter_child_nodes(node))
+        return False
+
+    def check_loops(self) -> Optional[int]:
+        """Flag frame-less infinite loops; return the heaviest frame's draw cost."""
+        heaviest = heaviest_loop = None
+        for node in ast.walk(self.tree):
+            if not isinstance(node, ast.While) or not self.is_forever(node):
+                continue
+            cost = self.draw_cost(node.body)
+            if heaviest is None or cost > heaviest:
+                heaviest, heaviest_loop = cost, node
+            if any(self.ends_frame(c) for c in self._calls(node.body)):
+                continue
+            if self.exits(node):
+                continue
+            if cost:
+                self.add(node, "warning", "no-frame",
+                         "infinite loop draws but never calls c.sleep() (or time.sleep()); "
+                         "it uses 100% CPU and floods the draw pipe")
+            else:
+                self.add(node, "warning", "busy-loop",
+                         "infinite loop never sleeps; it will use 100% CPU")
+        if heaviest is not None and heaviest > _HEAVY_FRAME:
+            self.add(heaviest_loop, "warning", "heavy-frame",
+                     f"about {heaviest} draw calls per frame; use c.pixel_buffer() "
+                     f"and c.blit() for per-pixel drawing")
+        return heaviest
+
+    def run(self) -> ValidationResult:
+        self.check_imports()
+        self.find_instances()
+        if self.api:
+            self.check_calls()
+        self.find_frame_functions()
+        cost = self.check_loops()
+        self.diagnostics.sort(key=lambda d: (d.severity != "error", d.line))
+        return ValidationResult(self.diagnostics, cost)
+
+
+def validate(code: str) -> ValidationResult:
+    """
+    Check generated code without running it. Cached by code hash.
+
+    Args:
+        code: cleaned program source
+
+    Returns:
+        ValidationResult (syntax errors are reported as a diagnostic)
+    """
+    key = hashlib.sha1(code.encode("utf-8", errors="replace")).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    try:
+        tree = ast.parse(code)
+        compile(tree, "<program>", "exec")  # e.g. 'return' outside function
+    except SyntaxError as e:
+        result = ValidationResult([Diagnostic(e.lineno or 0, "error", "syntax",
+                                              f"SyntaxError: {e.msg} at line {e.lineno}")])
+    else:
+        result = _Checker(tree).run()
+
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
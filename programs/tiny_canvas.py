@@ -1,13 +1,99 @@
+import atexit
+import json
+import mmap
+import numbers
 import os
+import struct
 import sys
 import time
+from itertools import groupby
+
+# Binary draw protocol — keep in sync with display/canvas_protocol.py.
+# opcode:u8, four int16 geometry args, r:u8, g:u8, b:u8
+_RECORD = struct.Struct("<B4h3B")
+_OP_CLEAR = 1
+_OP_PIXEL = 2
+_OP_LINE = 3
+_OP_RECT = 4
+_OP_FILLRECT = 5
+_OP_CIRCLE = 6
+_OP_FILLCIRCLE = 7
+_OP_FLIP = 8
+_OP_BLIT = 9
+_OP_LINES = 10
+_OP_POLYLINE = 11
+_OP_POLYGON = 12
+_OP_POINTS = 13
+_OP_FILLRECTS = 14
+_MAX_BATCH = 32767
+# Shared pixel buffer: header holding the seq of the last BLIT the display
+# copied, then two frames; BLIT sends (half, seq)
+_PIXEL_HEADER = struct.Struct("<I")
+_BLIT_SEQ_MASK = 0x7fff
+_OP_NAMES = {1: "clear", 2: "pixel", 3: "line", 4: "rect", 5: "fill_rect",
+             6: "circle", 7: "fill_circle", 8: "flip", 9: "blit", 10: "lines",
+             11: "polyline", 12: "polygon", 13: "points", 14: "fill_rects"}
+_BATCH_OPS = (_OP_LINES, _OP_POINTS, _OP_FILLRECTS)  # header a = item count
+_PREFLIGHT_MAX_COMMANDS = 200000  # for programs that never end a frame
+_PREFLIGHT_MAX_WARNINGS = 5
+
+_real_sleep = time.sleep
+
+
+def _clamp16(v):
+    return max(-32768, min(32767, int(v)))
+
+
+def _clamp8(v):
+    return max(0, min(255, int(v)))
+
+
+class PixelBuffer:
+    """
+    Direct RGB framebuffer for per-pixel programs (plasma, fire, ...).
+    Write pixels with set()/set_row()/fill(), then call c.blit() once per
+    frame. Shared with the display when the runtime offers it, so a full
+    frame costs one command instead of one per pixel.
+    """
+
+    def __init__(self, width, height, buf):
+        self.width = width
+        self.height = height
+        self.buf = buf  # writable, row-major, 3 bytes (r, g, b) per pixel
+
+    def set(self, x, y, r, g, b):
+        """Set one pixel. Out-of-bounds writes are ignored."""
+        x = int(x)
+        y = int(y)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = (y * self.width + x) * 3
+            self.buf[i:i + 3] = bytes((int(r) & 255, int(g) & 255, int(b) & 255))
+
+    def set_row(self, y, data):
+        """Replace row y with width*3 bytes of r, g, b values (extra bytes are cut off)."""
+        y = int(y)
+        if 0 <= y < self.height:
+            row = bytes(data)[:self.width * 3]
+            i = y * self.width * 3
+            self.buf[i:i + len(row)] = row
+
+    def fill(self, r=0, g=0, b=0):
+        """Fill the whole buffer with one color."""
+        self.buf[:] = bytes((int(r) & 255, int(g) & 255, int(b) & 255)) * (self.width * self.height)
+
 
 class Canvas:
     """
     A simple interface for drawing on the Tiny Programmer canvas.
-    Outputs commands to stdout that the main process interprets.
+    Outputs commands that the main process interprets: compact binary
+    records on the draw pipe when the runtime offers one (TINY_CANVAS_FD),
+    otherwise "CMD:" text lines on stdout.
     Canvas dimensions come from TINY_CANVAS_W/H env vars set by the
     runtime, falling back to the 480x320 reference size.
+
+    With TINY_CANVAS_PREFLIGHT=N the canvas only records: draw commands
+    are counted and their colours checked, sleeps don't block, and after
+    N frames the program exits printing "PREFLIGHT:{json stats}".
     """
 
     def __init__(self, w=None, h=None):
@@ -15,50 +101,346 @@ class Canvas:
         self.height = h if h is not None else int(os.environ.get("TINY_CANVAS_H", 218))
         # Flush immediately so animation is smooth
         sys.stdout.reconfigure(line_buffering=True)
-    
+        self._pipe = self._open_draw_pipe()
+        self._pixels = None
+        self._shared_pixels = None  # both frames of the shared buffer
+        self._half = 0  # the frame being drawn into
+        self._pixel_header = None
+        self._blit_seq = 0
+        self._half_seq = [0, 0]  # seq of the BLIT that last named each half
+        self._sent_pixels = None
+        # Frames end at c.sleep(); many programs pace themselves with
+        # time.sleep() instead, so treat that as a frame boundary too.
+        time.sleep = self.sleep
+        self._preflight = None
+        frames = int(os.environ.get("TINY_CANVAS_PREFLIGHT", "0") or 0)
+        if frames > 0:
+            self._start_preflight(frames)
+        if self._pipe is not None:
+            atexit.register(self._flush)
+
+    def _start_preflight(self, frames):
+        """Record instead of drawing (see class docstring)."""
+        self._preflight = {"frames": 0, "target_frames": frames, "commands": 0,
+                           "ops": {}, "warnings": [], "dropped": 0, "coerced": 0}
+        self._pipe = open(os.devnull, "wb", buffering=65536)
+        self._write = self._record
+
+    def _record(self, op, a, b, c, d, r, g, bl):
+        """Preflight stand-in for _write: count the command, check its colour."""
+        stats = self._preflight
+        name = _OP_NAMES.get(op, str(op))
+        count = a if op in _BATCH_OPS else 1
+        stats["ops"][name] = stats["ops"].get(name, 0) + count
+        stats["commands"] += count
+        if op not in (_OP_FLIP, _OP_BLIT):
+            for v in (r, g, bl):
+                if not isinstance(v, numbers.Integral) or not 0 <= v <= 255:
+                    # Not numbers: never drawn. Other bad values: clamped
+                    # by the binary protocol, dropped by the text one
+                    if all(isinstance(x, numbers.Real) for x in (r, g, bl)):
+                        stats["coerced"] += 1
+                    else:
+                        stats["dropped"] += 1
+                    warning = f"{name}: colour {(r, g, bl)!r} is not 0-255 ints"
+                    if (warning not in stats["warnings"]
+                            and len(stats["warnings"]) < _PREFLIGHT_MAX_WARNINGS):
+                        stats["warnings"].append(warning)
+                    break
+        written = Canvas._write(self, op, a, b, c, d, r, g, bl)
+        if op == _OP_FLIP:
+            stats["frames"] += 1
+        if stats["frames"] >= stats["target_frames"] or stats["commands"] >= _PREFLIGHT_MAX_COMMANDS:
+            self._finish_preflight()
+        return written
+
+    def _finish_preflight(self):
+        """Report the recorded stats and end the program."""
+        sys.stdout.flush()
+        sys.stdout.write("PREFLIGHT:" + json.dumps(self._preflight) + "\n")
+        sys.stdout.flush()
+        os._exit(0)
+
+    def _open_draw_pipe(self):
+        """Open the binary draw pipe if the runtime passed one."""
+        fd = os.environ.get("TINY_CANVAS_FD")
+        if not fd:
+            return None
+        try:
+            return os.fdopen(int(fd), "wb", buffering=65536)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, op, a, b, c, d, r, g, bl):
+        """Append one binary record, coercing out-of-range values.
+
+        Values that aren't numbers at all (a colour tuple, "red") drop the
+        record, like a malformed text command. Returns False then.
+        """
+        try:
+            record = _RECORD.pack(op, int(a), int(b), int(c), int(d), r, g, bl)
+        except (struct.error, TypeError, ValueError, OverflowError):
+            try:
+                record = _RECORD.pack(
+                    op, _clamp16(a), _clamp16(b), _clamp16(c), _clamp16(d),
+                    _clamp8(r), _clamp8(g), _clamp8(bl))
+            except (TypeError, ValueError, OverflowError):
+                return False
+        self._pipe.write(record)
+        return True
+
+    def _pack_items(self, items):
+        """Pack (a, b, c, d, r, g, b) item tuples into batch item records.
+
+        Returns None if an item can't be packed (see _write).
+        """
+        pack = _RECORD.pack
+        try:
+            return b"".join([pack(0, int(a), int(b), int(c), int(d), r, g, bl)
+                             for a, b, c, d, r, g, bl in items])
+        except (struct.error, TypeError, ValueError, OverflowError):
+            pass
+        try:
+            return b"".join([pack(0, _clamp16(a), _clamp16(b), _clamp16(c), _clamp16(d),
+                                  _clamp8(r), _clamp8(g), _clamp8(bl))
+                             for a, b, c, d, r, g, bl in items])
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+    def _write_batch(self, op, items, flag=0, r=0, g=0, b=0, count=None):
+        """Send a batch: one header record, then one record per item.
+
+        The whole batch is dropped if any of it can't be packed.
+        """
+        data = self._pack_items(items)
+        if data is None:
+            return
+        if self._write(op, len(items) if count is None else count, flag, 0, 0, r, g, b):
+            self._pipe.write(data)
+
+    def _colored(self, seq, n_geom, r, g, b):
+        """Normalize batch items to (a, b, c, d, r, g, b) tuples.
+
+        Items are n_geom numbers, optionally followed by their own r, g, b.
+        """
+        pad = (0,) * (4 - n_geom)
+        color = (r, g, b)
+        items = []
+        for item in seq:
+            item = tuple(item)
+            if len(item) >= n_geom + 3:
+                items.append(item[:n_geom] + pad + item[n_geom:n_geom + 3])
+            else:
+                items.append(item[:n_geom] + pad + color)
+        return items
+
+    def _send_items(self, name, op, n_geom, items):
+        """Send colored items as one (or a few, if huge) batch commands."""
+        for start in range(0, len(items), _MAX_BATCH):
+            chunk = items[start:start + _MAX_BATCH]
+            if self._pipe:
+                self._write_batch(op, chunk)
+            else:
+                try:
+                    args = ",".join(
+                        ",".join(str(int(v)) for v in item[:n_geom] + item[4:])
+                        for item in chunk)
+                except (TypeError, ValueError, OverflowError):
+                    continue  # dropped, like in the binary protocol
+                print(f"CMD:{name},{args}")
+
+    def _send_points(self, name, op, points, flag, r, g, b):
+        """Send a POLYLINE/POLYGON batch (at most _MAX_BATCH points)."""
+        points = [tuple(p) for p in points[:_MAX_BATCH]]
+        if self._pipe:
+            coords = points + [(0, 0)] if len(points) % 2 else points
+            items = [coords[i] + coords[i + 1] + (0, 0, 0)
+                     for i in range(0, len(coords), 2)]
+            self._write_batch(op, items, flag, r, g, b, count=len(points))
+        else:
+            try:
+                args = ",".join(f"{int(x)},{int(y)}" for x, y in points)
+            except (TypeError, ValueError, OverflowError):
+                return  # dropped, like in the binary protocol
+            print(f"CMD:{name},{flag},{r},{g},{b},{args}")
+
+    def _flush(self):
+        if self._pipe is not None:
+            try:
+                self._pipe.flush()
+            except (OSError, ValueError):
+                pass
+
     def update(self):
         """Dummy method for compatibility."""
         pass
-        
+
     def move(self, *args):
         """Dummy method for compatibility."""
         pass
 
     def clear(self, r=0, g=0, b=0):
         """Clear screen with color."""
-        print(f"CMD:CLEAR,{r},{g},{b}")
+        if self._pipe:
+            self._write(_OP_CLEAR, 0, 0, 0, 0, r, g, b)
+        else:
+            print(f"CMD:CLEAR,{r},{g},{b}")
 
     def pixel(self, x, y, r=255, g=255, b=255):
         """Draw a single pixel."""
-        print(f"CMD:PIXEL,{int(x)},{int(y)},{r},{g},{b}")
+        if self._pipe:
+            self._write(_OP_PIXEL, x, y, 0, 0, r, g, b)
+        else:
+            print(f"CMD:PIXEL,{int(x)},{int(y)},{r},{g},{b}")
 
     def line(self, x1, y1, x2, y2, r=255, g=255, b=255):
         """Draw a line."""
-        print(f"CMD:LINE,{int(x1)},{int(y1)},{int(x2)},{int(y2)},{r},{g},{b}")
+        if self._pipe:
+            self._write(_OP_LINE, x1, y1, x2, y2, r, g, b)
+        else:
+            print(f"CMD:LINE,{int(x1)},{int(y1)},{int(x2)},{int(y2)},{r},{g},{b}")
 
     def rect(self, x, y, w, h, r=255, g=255, b=255):
         """Draw a rectangle outline."""
-        print(f"CMD:RECT,{int(x)},{int(y)},{int(w)},{int(h)},{r},{g},{b}")
+        if self._pipe:
+            self._write(_OP_RECT, x, y, w, h, r, g, b)
+        else:
+            print(f"CMD:RECT,{int(x)},{int(y)},{int(w)},{int(h)},{r},{g},{b}")
 
     def fill_rect(self, x, y, w, h, r=255, g=255, b=255):
         """Draw a filled rectangle."""
-        print(f"CMD:FILLRECT,{int(x)},{int(y)},{int(w)},{int(h)},{r},{g},{b}")
+        if self._pipe:
+            self._write(_OP_FILLRECT, x, y, w, h, r, g, b)
+        else:
+            print(f"CMD:FILLRECT,{int(x)},{int(y)},{int(w)},{int(h)},{r},{g},{b}")
 
     def circle(self, x, y, radius, r=255, g=255, b=255):
         """Draw a circle outline."""
-        print(f"CMD:CIRCLE,{int(x)},{int(y)},{int(radius)},{r},{g},{b}")
-    
+        if self._pipe:
+            self._write(_OP_CIRCLE, x, y, radius, 0, r, g, b)
+        else:
+            print(f"CMD:CIRCLE,{int(x)},{int(y)},{int(radius)},{r},{g},{b}")
+
     def fill_circle(self, x, y, radius, r=255, g=255, b=255):
         """Draw a filled circle."""
-        print(f"CMD:FILLCIRCLE,{int(x)},{int(y)},{int(radius)},{r},{g},{b}")
+        if self._pipe:
+            self._write(_OP_FILLCIRCLE, x, y, radius, 0, r, g, b)
+        else:
+            print(f"CMD:FILLCIRCLE,{int(x)},{int(y)},{int(radius)},{r},{g},{b}")
+
+    # Batch methods: many primitives in one message. Much faster than
+    # calling line()/pixel() in a loop when drawing meshes or particles.
+
+    def lines(self, segments, r=255, g=255, b=255):
+        """Draw many lines: segments of (x1, y1, x2, y2) or (x1, y1, x2, y2, r, g, b)."""
+        self._send_items("LINES", _OP_LINES, 4, self._colored(segments, 4, r, g, b))
+
+    def polyline(self, points, r=255, g=255, b=255, closed=False):
+        """Draw connected lines through a list of (x, y) points."""
+        if len(points) >= 2:
+            self._send_points("POLYLINE", _OP_POLYLINE, list(points), int(bool(closed)), r, g, b)
+
+    def polygon(self, points, r=255, g=255, b=255):
+        """Draw a polygon outline through a list of (x, y) points."""
+        if len(points) >= 3:
+            self._send_points("POLYGON", _OP_POLYGON, list(points), 0, r, g, b)
+
+    def fill_polygon(self, points, r=255, g=255, b=255):
+        """Draw a filled polygon through a list of (x, y) points."""
+        if len(points) >= 3:
+            self._send_points("POLYGON", _OP_POLYGON, list(points), 1, r, g, b)
+
+    def points(self, pts, r=255, g=255, b=255):
+        """Draw many pixels: pts of (x, y) or (x, y, r, g, b)."""
+        self._send_items("POINTS", _OP_POINTS, 2, self._colored(pts, 2, r, g, b))
+
+    def fill_rects(self, rects, r=255, g=255, b=255):
+        """Draw many filled rectangles: rects of (x, y, w, h) or (x, y, w, h, r, g, b)."""
+        self._send_items("FILLRECTS", _OP_FILLRECTS, 4, self._colored(rects, 4, r, g, b))
+
+    def pixel_buffer(self):
+        """Get the direct pixel buffer (see PixelBuffer). Call c.blit() to draw it.
+
+        The shared buffer always has the runtime's canvas size
+        (TINY_CANVAS_W/H), whatever size this Canvas was created with. It
+        holds two frames: blit() shows the one drawn so far and switches
+        to the other once the display is done with it.
+        """
+        if self._pixels is None:
+            fd = os.environ.get("TINY_CANVAS_SHM_FD")
+            if fd:
+                w = int(os.environ.get("TINY_CANVAS_W", 416))
+                h = int(os.environ.get("TINY_CANVAS_H", 218))
+                frame = w * h * 3
+                head = _PIXEL_HEADER.size
+                try:
+                    buf = memoryview(mmap.mmap(int(fd), head + frame * 2))
+                    self._pixel_header = buf[:head]
+                    self._shared_pixels = (buf[head:head + frame], buf[head + frame:])
+                    self._pixels = PixelBuffer(w, h, self._shared_pixels[0])
+                except (OSError, ValueError):
+                    self._shared_pixels = None
+            if self._pixels is None:
+                size = self.width * self.height * 3
+                self._sent_pixels = bytearray(size)
+                self._pixels = PixelBuffer(self.width, self.height, memoryview(bytearray(size)))
+        return self._pixels
+
+    def blit(self):
+        """Draw the pixel buffer onto the canvas."""
+        if self._pixels is None:
+            return
+        if self._shared_pixels:
+            half = self._half
+            other = 1 - half
+            acked = _PIXEL_HEADER.unpack_from(self._pixel_header)[0]
+            if (acked - self._half_seq[other]) & _BLIT_SEQ_MASK > _BLIT_SEQ_MASK // 2:
+                # The display hasn't copied the other half yet: skip this
+                # frame and keep drawing where we are, nobody reads it
+                return
+            # Show the finished frame; keep drawing on a copy of it in the
+            # other half
+            self._blit_seq = (self._blit_seq + 1) & _BLIT_SEQ_MASK
+            self._half_seq[half] = self._blit_seq
+            if self._pipe:
+                self._write(_OP_BLIT, half, self._blit_seq, 0, 0, 0, 0, 0)
+                self._flush()  # the display acknowledges what it has seen
+            else:
+                print(f"CMD:BLIT,{half},{self._blit_seq}")
+            self._half = other
+            self._shared_pixels[other][:] = self._shared_pixels[half]
+            self._pixels.buf = self._shared_pixels[other]
+            return
+        # No shared buffer: resend the rows that changed since last blit as
+        # runs of one colour, in fill_rects batches
+        buf = self._pixels.buf
+        sent = self._sent_pixels
+        stride = self.width * 3
+        runs = []
+        for y in range(self.height):
+            start = y * stride
+            row = bytes(buf[start:start + stride])
+            if row == sent[start:start + stride]:
+                continue
+            x = 0
+            for color, run in groupby(zip(row[0::3], row[1::3], row[2::3])):
+                n = len(list(run))
+                runs.append((x, y, n, 1) + color)
+                x += n
+        sent[:] = buf
+        if runs:
+            self._send_items("FILLRECTS", _OP_FILLRECTS, 4, runs)
 
     def show(self):
-        """Update the display (flip buffer)."""
-        # In this protocol, we assume immediate drawing, but this can be a sync point
-        # print("CMD:FLIP") 
-        # For now, commands render immediately
-        pass
-        
+        """Present the frame drawn so far (flip buffer)."""
+        if self._pipe:
+            self._write(_OP_FLIP, 0, 0, 0, 0, 0, 0, 0)
+            self._flush()
+        else:
+            print("CMD:FLIP")
+
     def sleep(self, seconds):
-        """Sleep for seconds."""
-        time.sleep(seconds)
+        """Present the current frame, then sleep for seconds."""
+        self.show()
+        if self._preflight is None:
+            _real_sleep(seconds)
@@ -182,10 +182,7 @@ class Plot3D:
             # Vertical edges
             ("000", "001"), ("100", "101"), ("110", "111"), ("010", "011"),
         ]
-        for a, b in edges:
-            p1 = corners[a]
-            p2 = corners[b]
-            self.c.line(p1[0], p1[1], p2[0], p2[1], *c_box)
+        self.c.lines([corners[a] + corners[b] for a, b in edges], *c_box)
 
     def _draw_axes(self, z_min, z_max):
         """Draw X, Y, Z axes through origin with tick marks."""
@@ -309,23 +306,24 @@ class Plot3D:
                 y = y0 + j * dy
                 projected[i][j] = self.project(x, y, z_values[i][j])
 
-        # Draw rows (lines along x for fixed j)
+        # Whole mesh goes out as one batch: (x1, y1, x2, y2, r, g, b) per edge
+        segments = []
+
+        # Rows (lines along x for fixed j)
         for j in range(n + 1):
             for i in range(n):
-                p1 = projected[i][j]
-                p2 = projected[i + 1][j]
                 avg_z = (z_values[i][j] + z_values[i + 1][j]) / 2
                 color = self._height_color(avg_z, z_min, z_max)
-                self.c.line(p1[0], p1[1], p2[0], p2[1], *color)
+                segments.append(projected[i][j] + projected[i + 1][j] + color)
 
-        # Draw columns (lines along y for fixed i)
+        # Columns (lines along y for fixed i)
         for i in range(n + 1):
             for j in range(n):
-                p1 = projected[i][j]
-                p2 = projected[i][j + 1]
                 avg_z = (z_values[i][j] + z_values[i][j + 1]) / 2
                 color = self._height_color(avg_z, z_min, z_max)
-                self.c.line(p1[0], p1[1], p2[0], p2[1], *color)
+                segments.append(projected[i][j] + projected[i][j + 1] + color)
+
+        self.c.lines(segments)
 
     # =========================================================================
     # Main loop
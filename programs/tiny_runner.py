@@ -0,0 +1,247 @@
+"""
+Warm runner ("zygote") for generated programs.
+
+Started once by programmer/runner.py. Imports the canvas helpers up front,
+then waits on its control socket. For each program it forks a child that
+already has everything imported, so a program starts in milliseconds
+instead of paying for interpreter startup and imports every time.
+
+Program source arrives in the message and runs from memory (registered
+with linecache so tracebacks still show the failing line); nothing is
+written to disk. `tiny_runner.py -` runs a single program read from
+stdin the same way, for cold starts.
+
+Control socket (AF_UNIX, SOCK_SEQPACKET), one JSON message per packet:
+  parent -> runner: {"id", "code", "filename", "env", "fd_env", "limits"}
+                    with fds attached; fds[0] is the program's
+                    stdout/stderr, fd_env maps env var names to the index
+                    of the fd they should name, limits are applied in the
+                    child before it runs
+  runner -> parent: {"id", "pid"} once forked (or {"id", "error"}),
+                    {"pid", "exit"} when the program has exited
+"""
+
+import atexit
+import json
+import linecache
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import traceback
+import types
+
+# Preloaded for programs — the whole point of the runner
+import math  # noqa: F401
+import time
+import tiny_canvas  # noqa: F401
+import tiny_plot3d  # noqa: F401
+
+_MAX_MESSAGE = 1 << 20
+_DEFAULT_FILENAME = "<program>"
+
+
+def _send(sock, msg):
+    try:
+        sock.send(json.dumps(msg).encode())
+    except OSError:
+        pass
+
+
+def _print_program_traceback(e, filename):
+    """Print e like a plain `python program.py` run would, without our frames."""
+    tb = e.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != filename:
+        tb = tb.tb_next
+    traceback.print_exception(type(e), e, tb)
+
+
+def _install_preflight_sleep(frames):
+    """
+    TINY_CANVAS_PREFLIGHT for programs that never create a Canvas: every
+    time.sleep() ends a frame, doesn't block, and after frames of them the
+    program stops with the same PREFLIGHT: report tiny_canvas prints. A
+    Canvas replaces this with its own recording sleep.
+    """
+    count = [0]
+
+    def sleep(seconds):
+        count[0] += 1
+        if count[0] >= frames:
+            stats = {"frames": count[0], "target_frames": frames, "commands": 0,
+                     "ops": {}, "warnings": []}
+            sys.stdout.flush()
+            sys.stdout.write("PREFLIGHT:" + json.dumps(stats) + "\n")
+            sys.stdout.flush()
+            os._exit(0)
+
+    time.sleep = sleep
+
+
+def _run_program(source, filename):
+    """Run program source as __main__. Returns the exit code."""
+    frames = int(os.environ.get("TINY_CANVAS_PREFLIGHT", "0") or 0)
+    if frames > 0:
+        _install_preflight_sleep(frames)
+    # Source for tracebacks; mtime None keeps checkcache() from dropping it
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    main = types.ModuleType("__main__")
+    main.__builtins__ = __builtins__
+    sys.modules["__main__"] = main
+    sys.argv = [filename]
+    try:
+        exec(compile(source, filename, "exec"), main.__dict__)
+        code = 0
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        _print_program_traceback(e, filename)
+        code = 1
+    atexit._run_exitfuncs()  # e.g. tiny_canvas flushing the draw pipe
+    return code
+
+
+def _apply_limits(limits):
+    """Resource limits from programmer/sandbox.py's ResourceLimits."""
+    import resource
+    memory = limits.get("memory_mb") or 0
+    if memory > 0:
+        size = memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (size, size))
+    files = limits.get("max_open_files") or 0
+    if files > 0:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (files, files))
+    if (limits.get("nice") or 0) > 0:
+        os.nice(limits["nice"])
+    if limits.get("cgroup"):
+        with open(os.path.join(limits["cgroup"], "cgroup.procs"), "w") as f:
+            f.write("0")  # this process
+
+
+def _run_child(sock, wakeup_r, wakeup_w, msg, fds):
+    """In the forked child: become the program, never return."""
+    code = 1
+    try:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        sock.close()
+        os.close(wakeup_r)
+        os.close(wakeup_w)
+
+        # stdout/stderr go to the program's own pipe
+        os.dup2(fds[0], 1)
+        os.dup2(fds[0], 2)
+        os.close(fds[0])
+
+        env = dict(msg.get("env") or {})
+        for name, index in (msg.get("fd_env") or {}).items():
+            env[name] = str(fds[index])
+        os.environ.clear()
+        os.environ.update(env)
+
+        try:
+            _apply_limits(msg.get("limits") or {})
+        except (OSError, ValueError) as e:
+            print(f"[Runner] Could not apply limits: {e}", file=sys.stderr)
+
+        random.seed()  # forked children would otherwise share the runner's state
+        code = _run_program(msg["code"], msg.get("filename") or _DEFAULT_FILENAME)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(code)
+
+
+def _reap(sock):
+    """Report every child that has exited."""
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        _send(sock, {"pid": pid, "exit": os.waitstatus_to_exitcode(status)})
+
+
+def run_stdin():
+    """One-shot mode: run the program on stdin in this process."""
+    source = sys.stdin.read()
+    sys.stdin.close()
+    filename = sys.argv[2] if len(sys.argv) > 2 else _DEFAULT_FILENAME
+    code = 1
+    try:
+        code = _run_program(source, filename)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def main():
+    if sys.argv[1] == "-":
+        run_stdin()
+    sock = socket.socket(fileno=int(sys.argv[1]))
+    os.set_blocking(sock.fileno(), True)
+
+    # SIGCHLD wakes the select() below so exits are reported immediately
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    while True:
+        try:
+            ready, _, _ = select.select([sock, wakeup_r], [], [])
+        except InterruptedError:
+            continue
+        if wakeup_r in ready:
+            os.read(wakeup_r, 512)
+        _reap(sock)
+        if sock not in ready:
+            continue
+
+        try:
+            data, fds, _, _ = socket.recv_fds(sock, _MAX_MESSAGE, 8)
+        except OSError:
+            break
+        if not data:
+            break  # parent went away
+        try:
+            msg = json.loads(data)
+        except ValueError:
+            for fd in fds:
+                os.close(fd)
+            continue
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            pid = os.fork()
+        except OSError as e:
+            _send(sock, {"id": msg.get("id"), "error": str(e)})
+            pid = None
+        if pid == 0:
+            _run_child(sock, wakeup_r, wakeup_w, msg, fds)
+        if pid is not None:
+            _send(sock, {"id": msg.get("id"), "pid": pid})
+        # The child has its own copies now
+        for fd in fds:
+            os.close(fd)
+
+
+if __name__ == "__main__":
+    main()
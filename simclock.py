@@ -0,0 +1,114 @@
+"""
+Simulated Clock
+
+Everything that paces Tiny Programmer's behaviour — typing delays,
+thinking pauses, watch durations, BBS reading, the schedule and the
+screensaver — asks a clock instead of calling time.sleep()/time.time()
+directly:
+
+- RealClock:        the wall clock. Default.
+- FastForwardClock: virtual time. sleep() advances the clock instead of
+                    blocking (or blocks for a fraction of the time), so a
+                    full THINK → REFLECT cycle takes seconds instead of
+                    minutes. For throughput measurements and soak tests.
+
+Components take an optional clock argument and fall back to get_clock(),
+which follows config.TIME_SCALE (1 = real time, 0.01 = 100x faster,
+0 = sleeps don't block at all). Timeouts that guard real resources
+(subprocesses, HTTP requests, display refresh) keep using real time.
+"""
+
+import datetime
+import threading
+import time
+from typing import Optional
+
+
+class RealClock:
+    """Wall-clock time."""
+
+    fast_forward = False
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class FastForwardClock(RealClock):
+    """
+    Virtual time running ahead of the wall clock.
+
+    sleep(s) moves the clock forward by s but only blocks for s * scale,
+    so time() still advances by exactly s. The skipped time is shared by
+    all threads: two threads sleeping at once both push the clock forward.
+    """
+
+    fast_forward = True
+
+    def __init__(self, scale: float = 0.0):
+        """
+        Args:
+            scale: fraction of each sleep actually spent blocking (0-1)
+        """
+        self.scale = max(0.0, min(1.0, scale))
+        self._skipped = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, seconds: float):
+        """Jump the clock forward without blocking."""
+        if seconds > 0:
+            with self._lock:
+                self._skipped += seconds
+
+    @property
+    def skipped(self) -> float:
+        """Total seconds of virtual time that were not spent blocking."""
+        return self._skipped
+
+    def time(self) -> float:
+        return time.time() + self._skipped
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self._skipped
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        self.advance(seconds * (1.0 - self.scale))
+        if self.scale > 0:
+            time.sleep(seconds * self.scale)
+
+
+_clock: Optional[RealClock] = None
+
+
+def get_clock() -> RealClock:
+    """The process-wide clock, created from config.TIME_SCALE on first use."""
+    global _clock
+    if _clock is None:
+        import config
+        scale = getattr(config, "TIME_SCALE", 1.0)
+        if scale < 1.0:
+            _clock = FastForwardClock(scale)
+            print(f"[Clock] Fast-forward: sleeps scaled by {scale}")
+        else:
+            _clock = RealClock()
+    return _clock
+
+
+def set_clock(clock: RealClock):
+    """Replace the process-wide clock (before components are created)."""
+    global _clock
+    _clock = clock
@@ -130,20 +130,83 @@ def create_app():
         if not config.WEB_STREAM_ENABLED:
             return "Stream not enabled. Set WEB_STREAM_ENABLED=true to activate.", 404
 
-        from display.frame_stream import get_frame
+        from display.frame_stream import (
+            wait_frame, register_client, unregister_client, DEFAULT_QUALITY, DEFAULT_FPS)
+
+        # Per-viewer settings, e.g. /stream?quality=50&fps=5
+        quality = request.args.get('quality', DEFAULT_QUALITY, type=int)
+        fps = request.args.get('fps', DEFAULT_FPS, type=float)
+        quality = max(10, min(95, quality))
+        interval = 1.0 / max(1.0, fps)
 
         def generate():
-            while True:
-                frame = get_frame()
-                if frame:
-                    yield (
-                        b"--frame\r\n"
-                        b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
-                    )
-                time.sleep(0.05)  # ~20fps cap for the stream
+            client_id = register_client(quality, fps)
+            seq = 0
+            try:
+                while True:
+                    # Blocks until the screen changes; the timeout re-sends
+                    # the current frame so dead connections get noticed
+                    seq, frame = wait_frame(quality, seq)
+                    if frame:
+                        sent = time.monotonic()
+                        yield (
+                            b"--frame\r\n"
+                            b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
+                        )
+                        # Per-viewer fps cap; frames encoded meanwhile are
+                        # skipped, not queued
+                        time.sleep(max(0.0, interval - (time.monotonic() - sent)))
+                    else:
+                        time.sleep(interval)
+            finally:
+                unregister_client(client_id)
 
         return Response(generate(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
+    @app.route('/stream/tiles')
+    def tile_stream():
+        """Server-sent events carrying only the screen tiles that changed.
+
+        Each event is JSON: {"v": version, "w": width, "h": height,
+        "tiles": [[x, y, base64 PNG], ...]}. The first event has every tile.
+        """
+        import config
+        if not config.WEB_STREAM_ENABLED:
+            return "Stream not enabled. Set WEB_STREAM_ENABLED=true to activate.", 404
+
+        import base64
+        import json
+        from display.frame_stream import (
+            wait_tiles, register_client, unregister_client, DEFAULT_FPS)
+
+        fps = request.args.get('fps', DEFAULT_FPS, type=float)
+        interval = 1.0 / max(1.0, fps)
+
+        def generate():
+            client_id = register_client(None, fps)
+            version = 0
+            try:
+                while True:
+                    # Tiles that changed while we slept are picked up by
+                    # version, so a slow viewer just gets a bigger delta
+                    version, (width, height), tiles = wait_tiles(version)
+                    if not tiles:
+                        yield ": keepalive\n\n"  # lets dead connections surface
+                        continue
+                    sent = time.monotonic()
+                    payload = {
+                        "v": version, "w": width, "h": height,
+                        "tiles": [[x, y, base64.b64encode(png).decode("ascii")]
+                                  for x, y, _, _, png in tiles],
+                    }
+                    yield f"data: {json.dumps(payload, separators=(',', ':'))}\n\n"
+                    time.sleep(max(0.0, interval - (time.monotonic() - sent)))
+            finally:
+                unregister_client(client_id)
+
+        return Response(generate(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
     @app.route('/settings', methods=['GET', 'POST'])
     def settings():
         """Settings page - view and edit configuration."""